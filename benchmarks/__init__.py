@@ -0,0 +1,8 @@
+"""Benchmarks of the witty_one parser, run without Home Assistant."""
+
+import sys
+from pathlib import Path
+
+# The parser package does not depend on Home Assistant, import it directly
+# so the integration (and Home Assistant) is not imported.
+sys.path.insert(0, str(Path(__file__).parents[1] / "custom_components" / "witty_one"))
@@ -0,0 +1,47 @@
+"""
+Micro-benchmark of the decoding of each characteristic.
+
+Run from the root of the repository with `python -m benchmarks.decode`.
+For each characteristic it reports the cost of a decode without previous
+value, of a refresh with the same buffer (the previous value is shared)
+and of a refresh with a changed buffer (unchanged records are shared).
+"""
+
+import argparse
+import timeit
+from functools import partial
+
+from witty_one.codec import CODECS
+
+from .samples import buffers
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    first = buffers(0)
+    second = buffers(1)
+    print(f"{'characteristic':24} {'decode':>9} {'same':>9} {'changed':>9}  (us)")
+    for uuid, codec in CODECS.items():
+        buffer = first[uuid]
+        changed = second[uuid]
+        previous = codec.refresh(buffer)
+        results = [
+            timeit.timeit(function, number=args.number)
+            for function in (
+                partial(codec.refresh, buffer),
+                partial(codec.refresh, buffer, previous),
+                partial(codec.refresh, changed, previous),
+            )
+        ]
+        print(
+            f"{codec.name:24} "
+            + " ".join(f"{result / args.number * 1e6:9.2f}" for result in results)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""In-process stand-in for a Witty One and its bleak client."""
+
+import asyncio
+import dataclasses
+import random
+from typing import TYPE_CHECKING
+
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+
+from .samples import buffers
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from uuid import UUID
+
+
+@dataclasses.dataclass
+class FakeSettings:
+    """Behaviour of the fake charger, delays are in seconds."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    connect_latency: float = 0.0
+    # Probability for a read to lose the connection.
+    dropout: float = 0.0
+    # Probability for a read to return a truncated payload.
+    malformed: float = 0.0
+    # Reads in flight the proxy handles, the next ones return a truncated
+    # payload (0 for no limit).
+    max_in_flight: int = 0
+    charging: bool = True
+
+
+class FakeWittyOne:
+    """
+    A simulated charger serving realistic buffers for every characteristic.
+
+    Its values change each time `advance` is called. `connect` has the
+    signature of the connector of `WittyOneDeviceData`.
+    """
+
+    def __init__(
+        self,
+        address: str = "AA:BB:CC:DD:EE:FF",
+        settings: FakeSettings | None = None,
+        *,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the charger."""
+        self.address = address
+        self.settings = settings or FakeSettings()
+        self.random = random.Random(seed)
+        self.ble_device = BLEDevice(address, "Witty-1A2B", None)
+        self.tick = 0
+        # Buffers written, they replace the generated ones.
+        self.written: dict[UUID, bytearray] = {}
+        self.buffers = buffers(0, charging=self.settings.charging)
+        # Reads fail with an authentication error until the first pairing.
+        self.bonded = False
+        self.connections = 0
+        self.pairings = 0
+        self.reads = 0
+        self.writes = 0
+        self.dropouts = 0
+        self.malformed = 0
+        self.in_flight = 0
+
+    def advance(self) -> None:
+        """Move the values of the charger one step forward."""
+        self.tick += 1
+        self.buffers = buffers(self.tick, charging=self.settings.charging)
+        self.buffers.update(self.written)
+
+    async def connect(
+        self,
+        ble_device: BLEDevice,
+        disconnected_callback: Callable[[FakeBleakClient], None],
+    ) -> FakeBleakClient:
+        """Open a connection to the charger."""
+        if self.settings.connect_latency:
+            await asyncio.sleep(self.settings.connect_latency)
+        self.connections += 1
+        return FakeBleakClient(self, ble_device, disconnected_callback)
+
+    def delay(self) -> float:
+        """Return the duration of one read."""
+        jitter = self.random.uniform(0, self.settings.jitter)
+        return self.settings.latency + jitter
+
+
+@dataclasses.dataclass(frozen=True)
+class FakeCharacteristic:
+    """A characteristic, notifications are not simulated."""
+
+    uuid: UUID
+    handle: int
+    properties: tuple[str, ...] = ("read",)
+
+
+class _FakeServices:
+    def __init__(self, uuids: Iterable[UUID]) -> None:
+        self.characteristics = {
+            handle: FakeCharacteristic(uuid, handle)
+            for handle, uuid in enumerate(uuids, start=16)
+        }
+        self.by_uuid = {
+            characteristic.uuid: characteristic
+            for characteristic in self.characteristics.values()
+        }
+
+    def get_characteristic(self, specifier: UUID | int) -> FakeCharacteristic | None:
+        if isinstance(specifier, int):
+            return self.characteristics.get(specifier)
+        return self.by_uuid.get(specifier)
+
+
+class FakeBleakClient:
+    """The subset of `BleakClient` used by the parser."""
+
+    def __init__(
+        self,
+        device: FakeWittyOne,
+        ble_device: BLEDevice,
+        disconnected_callback: Callable[[FakeBleakClient], None],
+    ) -> None:
+        """Initialize a connected client."""
+        self.device = device
+        self.address = ble_device.address
+        self.services = _FakeServices(device.buffers)
+        self.is_connected = True
+        self._disconnected_callback = disconnected_callback
+
+    async def pair(self) -> bool:
+        """Pair with the charger, it is always accepted."""
+        self.device.bonded = True
+        self.device.pairings += 1
+        return True
+
+    async def clear_cache(self) -> bool:
+        """Clear the services cache, there is nothing to clear."""
+        return True
+
+    async def disconnect(self) -> bool:
+        """Close the connection."""
+        if self.is_connected:
+            self.is_connected = False
+            self._disconnected_callback(self)
+        return True
+
+    async def read_gatt_char(
+        self, specifier: FakeCharacteristic | int | UUID
+    ) -> bytearray:
+        """Read one characteristic, with the configured latency and errors."""
+        characteristic = (
+            specifier
+            if isinstance(specifier, FakeCharacteristic)
+            else self.services.get_characteristic(specifier)
+        )
+        if characteristic is None:
+            msg = f"Characteristic {specifier} not found"
+            raise BleakError(msg)
+        uuid = characteristic.uuid
+        device = self.device
+        device.in_flight += 1
+        overloaded = 0 < device.settings.max_in_flight < device.in_flight
+        try:
+            if delay := device.delay():
+                await asyncio.sleep(delay)
+        finally:
+            device.in_flight -= 1
+        if not self.is_connected:
+            msg = f"{self.address}: not connected"
+            raise BleakError(msg)
+        if not device.bonded:
+            msg = f"{self.address}: Insufficient authentication (5)"
+            raise BleakError(msg)
+        device.reads += 1
+
+        if device.random.random() < device.settings.dropout:
+            device.dropouts += 1
+            await self.disconnect()
+            msg = f"{self.address}: disconnected while reading {uuid}"
+            raise BleakError(msg)
+        buffer = device.buffers[uuid]
+        if overloaded or device.random.random() < device.settings.malformed:
+            device.malformed += 1
+            return buffer[: len(buffer) // 2]
+        return bytearray(buffer)
+
+    async def write_gatt_char(
+        self,
+        specifier: FakeCharacteristic | int | UUID,
+        data: bytes | bytearray,
+        *,
+        response: bool = False,  # noqa: ARG002 always acknowledged
+    ) -> None:
+        """Write one characteristic, it is read back as written."""
+        characteristic = (
+            specifier
+            if isinstance(specifier, FakeCharacteristic)
+            else self.services.get_characteristic(specifier)
+        )
+        if characteristic is None:
+            msg = f"Characteristic {specifier} not found"
+            raise BleakError(msg)
+        if not self.is_connected:
+            msg = f"{self.address}: not connected"
+            raise BleakError(msg)
+        device = self.device
+        device.writes += 1
+        device.written[characteristic.uuid] = bytearray(data)
+        device.buffers[characteristic.uuid] = bytearray(data)
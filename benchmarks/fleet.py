@@ -0,0 +1,294 @@
+"""
+Load test of a fleet of chargers polled behind a few proxies.
+
+Run from the root of the repository with `python -m benchmarks.fleet`.
+The chargers (see `benchmarks.fake`) are spread over simulated proxies
+refusing the connections beyond their slots. Each proxy is polled by a
+`WittyOneCollector` allowed as many connections as the proxy has slots, its
+chargers share the limit of reads in flight of the proxy, as they do in
+the integration. After `--warmup` seconds a memory snapshot is taken, then
+during `--duration` seconds the lag of the event loop and the age of the
+last successful poll of each charger are sampled. It reports the success
+rate of the polls, the connections refused by the proxies, the age and lag
+percentiles, and the memory per charger: the memory allocated by the
+parser at the end of the warm-up, and its growth until the end of the run
+(the difference of the two snapshots, see `GROWTH_FILTERS`).
+
+Home Assistant is not used: the coordinator, its scheduler and the choice
+of the proxy by the Bluetooth integration are not part of the run.
+
+Tracing the memory slows the allocations down, the lag includes it.
+
+Baseline, `python -m benchmarks.fleet` on Python 3.13 (20 chargers, 4
+proxies of 3 slots, 5 s interval, 5 s warm-up, 30 s run):
+
+    polls 120, success 99.2 %, never updated 0, refused 0, peak slots 2
+    age p50 2.5 s, p99 5.0 s, max 9.8 s
+    loop lag p50 0.5 ms, p99 9.9 ms, max 43.5 ms
+    memory 41.2 KiB per charger after warm-up, growth 0.4 KiB per charger
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import math
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from bleak.exc import BleakError
+from witty_one.collector import WittyOneCollector
+from witty_one.concurrency import ReadConcurrency
+
+from .fake import FakeSettings, FakeWittyOne
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from bleak.backends.device import BLEDevice
+    from witty_one.collector import ChargerStatus
+
+    from .fake import FakeBleakClient
+
+# Interval in seconds of the measures of the event loop lag and of the age
+# of the data.
+SAMPLE_INTERVAL = 0.1
+# Interval in seconds between two changes of the values of the chargers.
+ADVANCE_INTERVAL = 5.0
+# Typical timings through an ESPHome proxy, with a few lost connections.
+SETTINGS = FakeSettings(latency=0.02, jitter=0.02, connect_latency=0.5, dropout=0.002)
+# Only the memory allocated by the parser is measured, not the simulation.
+PARSER_FILTERS = [
+    tracemalloc.Filter(inclusive=True, filename_pattern=f"*{os.sep}witty_one{os.sep}*")
+]
+# The rolling histograms of the durations of the phases keep growing until
+# they are full, after 100 reads of each characteristic (3000 updates for
+# the ones read every 30 updates), they are left out of the growth.
+GROWTH_FILTERS = [
+    *PARSER_FILTERS,
+    tracemalloc.Filter(inclusive=False, filename_pattern=f"*{os.sep}metrics.py"),
+]
+
+
+class SimulatedProxy:
+    """A Bluetooth proxy refusing the connections beyond its slots."""
+
+    def __init__(self, name: str, slots: int) -> None:
+        """Initialize a proxy without connection."""
+        self.name = name
+        self.slots = slots
+        self.connected: set[str] = set()
+        self.chargers: dict[str, FakeWittyOne] = {}
+        self.refused = 0
+        self.peak = 0
+
+    async def connect(
+        self,
+        ble_device: BLEDevice,
+        disconnected_callback: Callable[[FakeBleakClient], None],
+    ) -> FakeBleakClient:
+        """Open a connection to a charger through a free slot."""
+        address = ble_device.address
+        if len(self.connected) >= self.slots:
+            self.refused += 1
+            msg = f"{self.name}: no free connection slot for {address}"
+            raise BleakError(msg)
+        # The slot is taken while connecting.
+        self.connected.add(address)
+        self.peak = max(self.peak, len(self.connected))
+
+        def disconnected(client: FakeBleakClient) -> None:
+            self.connected.discard(address)
+            disconnected_callback(client)
+
+        try:
+            return await self.chargers[address].connect(ble_device, disconnected)
+        except BaseException:
+            self.connected.discard(address)
+            raise
+
+
+def _build(
+    chargers: int, proxies: int, slots: int, interval: float, *, persistent: bool
+) -> tuple[list[SimulatedProxy], list[WittyOneCollector], list[FakeWittyOne]]:
+    fleet = [SimulatedProxy(f"proxy-{index}", slots) for index in range(proxies)]
+    fakes = []
+    for index in range(chargers):
+        fake = FakeWittyOne(
+            f"AA:BB:CC:DD:{index // 256:02X}:{index % 256:02X}",
+            # Half of the chargers are charging.
+            FakeSettings(**{**vars(SETTINGS), "charging": index % 2 == 0}),
+            seed=index,
+        )
+        fleet[index % proxies].chargers[fake.address] = fake
+        fakes.append(fake)
+
+    collectors = []
+    for proxy in fleet:
+        collector = WittyOneCollector(
+            proxy.chargers,
+            interval=interval,
+            concurrency=slots,
+            persistent=persistent,
+            logger=logging.getLogger(proxy.name),
+            connector=proxy.connect,  # pyright: ignore[reportArgumentType]
+        )
+        collector.devices = {
+            address: fake.ble_device for address, fake in proxy.chargers.items()
+        }
+        # The chargers of a proxy share its limit of reads in flight.
+        concurrency = ReadConcurrency()
+        for charger in collector.chargers.values():
+            charger.data.concurrency = concurrency
+        collectors.append(collector)
+    return fleet, collectors, fakes
+
+
+async def _advance(fakes: list[FakeWittyOne]) -> None:
+    while True:
+        await asyncio.sleep(ADVANCE_INTERVAL)
+        for fake in fakes:
+            fake.advance()
+
+
+async def _sample(
+    collectors: list[WittyOneCollector], ages: list[float], lags: list[float]
+) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        lags.append(loop.time() - start - SAMPLE_INTERVAL)
+        now = time.time()
+        ages.extend(
+            now - charger.last_success
+            for collector in collectors
+            for charger in collector.chargers.values()
+            if charger.last_success is not None
+        )
+
+
+def _totals(chargers: list[ChargerStatus]) -> tuple[int, int]:
+    return (
+        sum(charger.polls for charger in chargers),
+        sum(charger.failures for charger in chargers),
+    )
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    # Only the memory still used is compared.
+    gc.collect()
+    return tracemalloc.take_snapshot()
+
+
+def _memory(snapshot: tracemalloc.Snapshot, filters: list[tracemalloc.Filter]) -> int:
+    return sum(
+        stat.size for stat in snapshot.filter_traces(filters).statistics("filename")
+    )
+
+
+def _percentiles(values: list[float]) -> tuple[float, float, float]:
+    """Return the p50, p99 and maximum of `values`, NaN without values."""
+    if not values:
+        return math.nan, math.nan, math.nan
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return quantiles[49], quantiles[98], max(values)
+
+
+async def _run(args: argparse.Namespace) -> dict[str, float]:
+    tracemalloc.start()
+    before = _take_snapshot()
+    fleet, collectors, fakes = _build(
+        args.chargers,
+        args.proxies,
+        args.slots,
+        args.interval,
+        persistent=args.persistent,
+    )
+    chargers = [
+        charger for collector in collectors for charger in collector.chargers.values()
+    ]
+    ages: list[float] = []
+    lags: list[float] = []
+    with Path(os.devnull).open("w", encoding="utf-8") as output:  # noqa: ASYNC230 never blocks
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(collector.run(output, scan=False))
+                for collector in collectors
+            ]
+            tasks.append(group.create_task(_advance(fakes)))
+            await asyncio.sleep(args.warmup)
+            warm = _take_snapshot()
+            warm_polls, warm_failures = _totals(chargers)
+            tasks.append(group.create_task(_sample(collectors, ages, lags)))
+            await asyncio.sleep(args.duration)
+            end = _take_snapshot()
+            for task in tasks:
+                task.cancel()
+    tracemalloc.stop()
+
+    polls, failures = _totals(chargers)
+    polls -= warm_polls
+    failures -= warm_failures
+    footprint = _memory(warm, PARSER_FILTERS) - _memory(before, PARSER_FILTERS)
+    growth = _memory(end, GROWTH_FILTERS) - _memory(warm, GROWTH_FILTERS)
+    age = _percentiles(ages)
+    lag = _percentiles([lag * 1000 for lag in lags])
+    return {
+        "polls": polls,
+        "success": 100 * (polls - failures) / polls if polls else 0.0,
+        "never": sum(charger.last_success is None for charger in chargers),
+        "refused": sum(proxy.refused for proxy in fleet),
+        "peak_slots": max(proxy.peak for proxy in fleet),
+        "age_p50": age[0],
+        "age_p99": age[1],
+        "age_max": age[2],
+        "lag_p50": lag[0],
+        "lag_p99": lag[1],
+        "lag_max": lag[2],
+        "warm_kib": footprint / 1024 / len(chargers),
+        "growth_kib": growth / 1024 / len(chargers),
+    }
+
+
+def main() -> None:
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--chargers", type=int, default=20)
+    parser.add_argument("-p", "--proxies", type=int, default=4)
+    parser.add_argument("--slots", type=int, default=3, help="per proxy")
+    parser.add_argument("-i", "--interval", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=5.0, help="in seconds")
+    parser.add_argument("-d", "--duration", type=float, default=30.0)
+    parser.add_argument("--persistent", action="store_true")
+    args = parser.parse_args()
+
+    # The errors of the lost connections are expected.
+    logging.basicConfig(level=logging.CRITICAL)
+
+    result = asyncio.run(_run(args))
+    print(
+        f"polls {result['polls']:.0f}, success {result['success']:.1f} %,"
+        f" never updated {result['never']:.0f}, refused {result['refused']:.0f},"
+        f" peak slots {result['peak_slots']:.0f}"
+    )
+    print(
+        f"age p50 {result['age_p50']:.1f} s, p99 {result['age_p99']:.1f} s,"
+        f" max {result['age_max']:.1f} s"
+    )
+    print(
+        f"loop lag p50 {result['lag_p50']:.1f} ms, p99 {result['lag_p99']:.1f} ms,"
+        f" max {result['lag_max']:.1f} ms"
+    )
+    print(
+        f"memory {result['warm_kib']:.1f} KiB per charger after warm-up,"
+        f" growth {result['growth_kib']:.1f} KiB per charger"
+    )
+
+
+if __name__ == "__main__":
+    main()
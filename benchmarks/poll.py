@@ -0,0 +1,136 @@
+"""
+End-to-end benchmark of `WittyOneDeviceData.update_device`.
+
+Run from the root of the repository with `python -m benchmarks.poll`.
+Each scenario polls a fake charger (see `benchmarks.fake`) back to back
+and reports the p50 and p99 latency of the successful polls, the reads in
+flight learned, the reads per second and the time to recover from a failed
+poll (from the start of the first failed poll to the end of the next
+successful one).
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import replace
+
+from bleak.exc import BleakError
+from witty_one import WittyOneDeviceData
+from witty_one.capture import GattCapture
+from witty_one.codec import ParseError
+
+from .fake import FakeSettings, FakeWittyOne
+
+SCENARIOS: dict[str, FakeSettings] = {
+    # No delay at all: the cost of the parser itself.
+    "local": FakeSettings(),
+    # Typical timings through an ESPHome proxy.
+    "proxy": FakeSettings(latency=0.02, jitter=0.02, connect_latency=0.5),
+    # Same with lost connections and corrupted payloads.
+    "flaky": FakeSettings(
+        latency=0.02, jitter=0.02, connect_latency=0.5, dropout=0.02, malformed=0.01
+    ),
+    # A proxy truncating the payloads beyond two reads in flight.
+    "busy": FakeSettings(
+        latency=0.02, jitter=0.02, connect_latency=0.5, max_in_flight=2
+    ),
+}
+
+
+async def _run(
+    settings: FakeSettings,
+    polls: int,
+    *,
+    persistent: bool,
+    seed: int,
+    capture: GattCapture | None = None,
+) -> dict[str, float]:
+    charger = FakeWittyOne(settings=settings, seed=seed)
+    data = WittyOneDeviceData(
+        logging.getLogger(__name__),
+        persistent=persistent,
+        connector=charger.connect,  # pyright: ignore[reportArgumentType]
+    )
+    data.capture = capture
+    latencies: list[float] = []
+    recoveries: list[float] = []
+    failed_at: float | None = None
+
+    started = time.perf_counter()
+    for _ in range(polls):
+        charger.advance()
+        begin = time.perf_counter()
+        try:
+            await data.update_device(charger.ble_device)
+        except BleakError, ParseError:
+            if failed_at is None:
+                failed_at = begin
+            continue
+        end = time.perf_counter()
+        latencies.append(end - begin)
+        if failed_at is not None:
+            recoveries.append(end - failed_at)
+            failed_at = None
+    elapsed = time.perf_counter() - started
+    await data.disconnect()
+    if capture is not None:
+        capture.write()
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "failures": polls - len(latencies),
+        "connections": charger.connections,
+        "read_limit": data.concurrency.limit,
+        "reads_per_s": charger.reads / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "recovery_ms": statistics.fmean(recoveries) * 1000 if recoveries else 0.0,
+    }
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--polls", type=int, default=100)
+    parser.add_argument(
+        "-s", "--scenario", choices=SCENARIOS, action="append", dest="scenarios"
+    )
+    parser.add_argument("--persistent", action="store_true")
+    parser.add_argument("--idle", action="store_true", help="charger not charging")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--capture", metavar="FILE", help="append the buffers read to a capture"
+    )
+    args = parser.parse_args()
+
+    # The errors of the flaky scenario are expected.
+    logging.basicConfig(level=logging.CRITICAL)
+
+    columns = (
+        "failures",
+        "connections",
+        "read_limit",
+        "reads_per_s",
+        "p50_ms",
+        "p99_ms",
+        "recovery_ms",
+    )
+    print(f"{'scenario':10}" + "".join(f"{column:>13}" for column in columns))
+    for name in args.scenarios or SCENARIOS:
+        settings = replace(SCENARIOS[name], charging=not args.idle)
+        result = asyncio.run(
+            _run(
+                settings,
+                args.polls,
+                persistent=args.persistent,
+                seed=args.seed,
+                capture=GattCapture(args.capture) if args.capture else None,
+            )
+        )
+        print(f"{name:10}" + "".join(f"{result[column]:13.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
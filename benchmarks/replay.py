@@ -0,0 +1,84 @@
+"""
+Replay a capture of raw GATT reads through `WittyOneDeviceData`.
+
+Run from the root of the repository with `python -m benchmarks.replay FILE`.
+The capture is written by the integration (option "Capture the raw reads")
+or by `python -m benchmarks.poll --capture FILE`. The polls are run back to
+back until the buffers of the capture are used, the buffers that fail to be
+decoded are printed in hex with their error.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+from witty_one import WittyOneDeviceData
+from witty_one.capture import ReplayCharger, read_capture
+from witty_one.codec import CODECS, ParseError
+
+
+def _decode_errors(path: str) -> list[str]:
+    """Return the buffers of the capture that fail to be decoded."""
+    errors = []
+    for read in read_capture(path):
+        try:
+            CODECS[read.uuid].decode(read.data)
+        except ParseError as err:
+            errors.append(f"{read.timestamp:.3f} {CODECS[read.uuid].name}: {err}")
+    return errors
+
+
+async def _replay(path: str) -> dict[str, float]:
+    charger = ReplayCharger(read_capture(path))
+    buffers = charger.remaining
+    data = WittyOneDeviceData(
+        logging.getLogger(__name__),
+        persistent=True,
+        connector=charger.connect,  # pyright: ignore[reportArgumentType]
+    )
+    ble_device = BLEDevice("00:00:00:00:00:00", "replay", None)
+    polls = failures = 0
+    started = time.perf_counter()
+    while charger.remaining:
+        reads = charger.reads
+        try:
+            await data.update_device(ble_device)
+        except ParseError:
+            failures += 1
+        except BleakError:
+            # The capture is used, or the poll needs a buffer not captured.
+            if charger.reads == reads:
+                break
+            failures += 1
+        polls += 1
+    elapsed = time.perf_counter() - started
+    await data.disconnect()
+    return {
+        "buffers": buffers,
+        "reads": charger.reads,
+        "polls": polls,
+        "failures": failures,
+        "polls_per_s": polls / elapsed if elapsed else 0.0,
+        "reads_per_s": charger.reads / elapsed if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    """Replay the capture."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("capture", metavar="FILE")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    for error in _decode_errors(args.capture):
+        print(error)
+    result = asyncio.run(_replay(args.capture))
+    print(" ".join(f"{name}={value:.1f}" for name, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
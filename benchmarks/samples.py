@@ -0,0 +1,94 @@
+"""Realistic buffers for each characteristic of a Witty One."""
+
+import struct
+from typing import TYPE_CHECKING
+
+from witty_one.const import (
+    AMBIENT_TEMP_UUID,
+    CABLE_LOCK_UUID,
+    CAR_DETECT_UUID,
+    CHARGING_NUMBER_UUID,
+    COMMUTATION_UUID,
+    CONFIG_CABLE_LOCK_UUID,
+    CONNECTION_STATE_UUID,
+    DATE_STR_UUID,
+    DURATIONS_UUID,
+    ELECTRIC_STATE_UUID,
+    ENERGY_UUID,
+    HMI_BOARD_VERSION_UUID,
+    MAIN_BOARD_VERSION_UUID,
+    MAINSTATE_CHARGING,
+    MAINSTATE_IDLE,
+    MODEL_UUID,
+    NAME_UUID,
+    PACKAGE_VERSION_UUID,
+    RELAY_TEMP_UUID,
+    RF_BOARD_VERSION_UUID,
+    SESSION_STATE_UUID,
+    STARTUP_COUNT_UUID,
+    STATE_UUID,
+    UNK_TEMP_UUID,
+)
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+
+def _string(text: str, size: int = 32) -> bytearray:
+    data = text.encode("utf-8")
+    return bytearray(struct.pack("<H", size) + data.ljust(size, b"\0"))
+
+
+def _pack(fmt: str, *values: object) -> bytearray:
+    return bytearray(struct.pack("<H" + fmt, struct.calcsize("<" + fmt), *values))
+
+
+def buffers(tick: int = 0, *, charging: bool = True) -> dict[UUID, bytearray]:
+    """
+    Return the buffer of each characteristic after `tick` updates.
+
+    While charging, the power changes on each tick and the energies grow.
+    """
+    mainstate = MAINSTATE_CHARGING if charging else MAINSTATE_IDLE
+    current = (16000 + (tick % 7) * 10) if charging else 0
+    voltage = 230000 + (tick % 5) * 100
+    power = voltage * current // 1000
+    energy = 1_234_567_000 + (tick * power // 120 if charging else 0)
+
+    phase = [voltage, current, power, power, 0, 1000, 1000, 1]
+    phases = [*phase, *phase, *phase, 3 * power, 3 * power, 0, 1000, 1000, 1, 50000]
+    energies = [energy, 0, 1000, 0, energy] * 3
+    total = [3 * energy, 0, 3000, 0, 3 * energy]
+
+    return {
+        NAME_UUID: _string("Witty-1A2B"),
+        MODEL_UUID: _string("XVR111STI"),
+        DATE_STR_UUID: _string("2024-05-01T12:00:00"),
+        PACKAGE_VERSION_UUID: _pack("BBBBB", 1, 4, 2, 0, 0),
+        MAIN_BOARD_VERSION_UUID: _pack("BBBBBBBBB", 1, 4, 2, 0, 0, 1, 0, 3, 0),
+        RF_BOARD_VERSION_UUID: _pack("BBBBBBBBB", 2, 1, 0, 5, 0, 1, 0, 1, 0),
+        HMI_BOARD_VERSION_UUID: _pack("BBBBBBBBB", 1, 2, 0, 0, 0, 1, 0, 0, 0),
+        STATE_UUID: _pack("IH", mainstate << 8 | 1, 0),
+        STARTUP_COUNT_UUID: _pack("I", 42),
+        DURATIONS_UUID: _pack("IIII", 9_000_000, 1_200_000, 3600 + tick, 60),
+        COMMUTATION_UUID: _pack("QQQQ", 1500, 1500, 1500, 12),
+        CAR_DETECT_UUID: _pack("I", 1 if charging else 0),
+        CHARGING_NUMBER_UUID: _pack("I", 320),
+        CABLE_LOCK_UUID: _pack("H", 1 if charging else 0),
+        ENERGY_UUID: _pack("Q" * 20, *energies, *total),
+        ELECTRIC_STATE_UUID: _pack("l" * 31, *phases),
+        AMBIENT_TEMP_UUID: _pack("hhh", 2512, 1800, 4500),
+        RELAY_TEMP_UUID: _pack("hhh", 3100 + tick % 10, 1900, 6200),
+        UNK_TEMP_UUID: _pack("hhh", 2800, 1800, 5000),
+        CONNECTION_STATE_UUID: _pack("HHHHHH", 5, 0x14, 0x10, 0, 0, 3),
+        SESSION_STATE_UUID: _pack(
+            "L7sLQB7s",
+            1_714_564_800,
+            b"\x01\x02\x03\x04\x05\x06\x07",
+            3600 + tick * 30,
+            7_400_000 + tick * power // 120,
+            1,
+            b"\x04\xa2\x3b\x12\x7c\x80\x00",
+        ),
+        CONFIG_CABLE_LOCK_UUID: _pack("B", 1),
+    }
@@ -7,15 +7,16 @@ https://github.com/ngraziano/hass-witty
 
 from __future__ import annotations
 
-from datetime import timedelta
 from typing import TYPE_CHECKING
 
 from homeassistant.const import Platform
 from homeassistant.loader import async_get_loaded_integration
 
-from .const import DOMAIN, LOGGER
-from .coordinator import WittyOneDataUpdateCoordinator
+from .const import DOMAIN
+from .coordinator import MAX_UPDATE_INTERVAL, WittyOneDataUpdateCoordinator
 from .data import WittyOneData
+from .external_statistics import WittyOneStatistics
+from .store import WittyOneCache
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -23,7 +24,9 @@ if TYPE_CHECKING:
     from .data import WittyOneConfigEntry
 
 PLATFORMS: list[Platform] = [
+    Platform.BINARY_SENSOR,
     Platform.SENSOR,
+    Platform.SWITCH,
 ]
 
 
@@ -35,9 +38,7 @@ async def async_setup_entry(
     """Set up this integration using UI."""
     coordinator = WittyOneDataUpdateCoordinator(
         hass=hass,
-        logger=LOGGER,
-        name=DOMAIN,
-        update_interval=timedelta(minutes=1),
+        config_entry=entry,
     )
 
     entry.runtime_data = WittyOneData(
@@ -45,11 +46,20 @@ async def async_setup_entry(
         coordinator=coordinator,
     )
 
-    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
+    # Entities are created from the cache and restore their last state,
+    # the first poll runs in the background so a charger out of reach
+    # does not delay the startup.
+    await coordinator.async_restore()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(coordinator.statistics.async_start())
+    entry.async_on_unload(coordinator.async_track_advertisements())
+
+    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.title}"
+    )
 
     return True
 
@@ -62,6 +72,15 @@ async def async_unload_entry(
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: WittyOneConfigEntry,
+) -> None:
+    """Remove the cache and the saved samples of the device."""
+    await WittyOneCache(hass, entry.unique_id or entry.entry_id).async_remove()
+    await WittyOneStatistics(hass, entry, MAX_UPDATE_INTERVAL).async_remove()
+
+
 async def async_reload_entry(
     hass: HomeAssistant,
     entry: WittyOneConfigEntry,
@@ -0,0 +1,64 @@
+"""Binary sensor platform for witty_one."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+
+from .entity import WittyOneEntity
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .coordinator import WittyOneDataUpdateCoordinator
+    from .data import WittyOneConfigEntry
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: WittyOneConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the binary sensor platform."""
+    async_add_entities([WittyOnePresenceSensor(entry.runtime_data.coordinator)])
+
+
+class WittyOnePresenceSensor(WittyOneEntity, BinarySensorEntity):
+    """The charger is heard by a Bluetooth adapter or proxy, or connected."""
+
+    entity_description = BinarySensorEntityDescription(
+        key="presence",
+        translation_key="presence",
+        device_class=BinarySensorDeviceClass.CONNECTIVITY,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    )
+
+    def __init__(self, coordinator: WittyOneDataUpdateCoordinator) -> None:
+        """Initialize the binary sensor class."""
+        super().__init__(coordinator, self.entity_description.key, frozenset())
+        self._attr_is_on = self._present()
+
+    @property
+    def available(self) -> bool:
+        """Return True, the presence is known without connecting."""
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the presence changed."""
+        if (present := self._present()) == self._attr_is_on:
+            return
+        self._attr_is_on = present
+        self.async_write_ha_state()
+
+    def _present(self) -> bool:
+        # A connected charger does not advertise.
+        return self.coordinator.present or self.coordinator.witty.is_connected
@@ -8,10 +8,30 @@ import voluptuous as vol
 from homeassistant.components.bluetooth import (
     async_discovered_service_info,
 )
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_ADDRESS
-
-from .const import DOMAIN
+from homeassistant.core import callback
+
+from .const import (
+    CONF_CAPTURE,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_TIMEOUT,
+    CONF_NOTIFICATIONS,
+    CONF_PERSISTENT_CONNECTION,
+    CONF_SLOW_INTERVAL,
+    DEFAULT_CAPTURE,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_NOTIFICATIONS,
+    DEFAULT_PERSISTENT_CONNECTION,
+    DEFAULT_SLOW_INTERVAL,
+    DOMAIN,
+)
 
 if TYPE_CHECKING:
     from habluetooth import BluetoothServiceInfoBleak
@@ -19,6 +39,25 @@ if TYPE_CHECKING:
 
 SERVICE_UUID = "0000cf60-ea50-49f9-9471-a3fe0cfce893"
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_FAST_INTERVAL, default=DEFAULT_FAST_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=3600)
+        ),
+        vol.Required(CONF_SLOW_INTERVAL, default=DEFAULT_SLOW_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=3600)
+        ),
+        vol.Required(
+            CONF_PERSISTENT_CONNECTION, default=DEFAULT_PERSISTENT_CONNECTION
+        ): bool,
+        vol.Required(CONF_IDLE_TIMEOUT, default=DEFAULT_IDLE_TIMEOUT): vol.All(
+            vol.Coerce(int), vol.Range(min=10, max=3600)
+        ),
+        vol.Required(CONF_NOTIFICATIONS, default=DEFAULT_NOTIFICATIONS): bool,
+        vol.Required(CONF_CAPTURE, default=DEFAULT_CAPTURE): bool,
+    }
+)
+
 
 class WittyOneFlowHandler(ConfigFlow, domain=DOMAIN):
     """Config flow for witty one."""
@@ -29,6 +68,14 @@ class WittyOneFlowHandler(ConfigFlow, domain=DOMAIN):
         """Inialize config flow."""
         self._discovered_devices: dict[str, str] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: ConfigEntry,  # noqa: ARG004 Unused static method argument
+    ) -> WittyOneOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return WittyOneOptionsFlowHandler()
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> ConfigFlowResult:
@@ -92,3 +139,26 @@ class WittyOneFlowHandler(ConfigFlow, domain=DOMAIN):
                 {vol.Required(CONF_ADDRESS): vol.In(self._discovered_devices)}
             ),
         )
+
+
+class WittyOneOptionsFlowHandler(OptionsFlow):
+    """Options flow for witty one."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the connection options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_FAST_INTERVAL] > user_input[CONF_SLOW_INTERVAL]:
+                errors[CONF_FAST_INTERVAL] = "fast_interval_too_slow"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, user_input or self.config_entry.options
+            ),
+            errors=errors,
+        )
@@ -6,3 +6,22 @@ LOGGER: Logger = getLogger(__package__)
 
 DOMAIN = "witty_one"
 MANUFACTURER = "Hager"
+
+CONF_PERSISTENT_CONNECTION = "persistent_connection"
+CONF_IDLE_TIMEOUT = "idle_timeout"
+CONF_NOTIFICATIONS = "notifications"
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_SLOW_INTERVAL = "slow_interval"
+CONF_CAPTURE = "capture"
+
+DEFAULT_PERSISTENT_CONNECTION = False
+DEFAULT_IDLE_TIMEOUT = 120
+DEFAULT_NOTIFICATIONS = False
+DEFAULT_FAST_INTERVAL = 30
+DEFAULT_SLOW_INTERVAL = 300
+DEFAULT_CAPTURE = False
+
+# ESPHome proxies have 3 connection slots, keep one free for other devices.
+MAX_CONNECTIONS_PER_SOURCE = 2
+# Minimum delay in seconds between two connections through the same source.
+STAGGER_DELAY = 2.0
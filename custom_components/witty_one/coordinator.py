@@ -2,67 +2,534 @@
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import dataclasses
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
 
+from bleak.exc import BleakError
 from bleak_retry_connector import (
     close_stale_connections_by_address,
 )
 from homeassistant.components import bluetooth
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothScanningMode,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.exceptions import ConfigEntryError, ConfigEntryNotReady
+from homeassistant.core import callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import slugify
 
 from custom_components.witty_one.witty_one.parser import (
+    DEFAULT_POLL_TIMEOUT,
+    CommandError,
     WittyOneDevice,
     WittyOneDeviceData,
+    model_id_to_name,
+)
+
+from .const import (
+    CONF_CAPTURE,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_TIMEOUT,
+    CONF_NOTIFICATIONS,
+    CONF_PERSISTENT_CONNECTION,
+    CONF_SLOW_INTERVAL,
+    DEFAULT_CAPTURE,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_NOTIFICATIONS,
+    DEFAULT_PERSISTENT_CONNECTION,
+    DEFAULT_SLOW_INTERVAL,
+    DOMAIN,
+    LOGGER,
+    MANUFACTURER,
 )
+from .external_statistics import WittyOneStatistics
+from .routing import WittyOneRouter
+from .scheduler import async_get_scheduler
+from .store import WittyOneCache
+from .witty_one.breaker import BreakerState, CircuitBreaker
+from .witty_one.capture import GattCapture
+from .witty_one.codec import ParseError
+from .witty_one.const import ACTIVE_MAINSTATES
+
+if TYPE_CHECKING:
+    from uuid import UUID
 
-from .const import LOGGER
+    from homeassistant.components.bluetooth import (
+        BluetoothChange,
+        BluetoothScannerDevice,
+        BluetoothServiceInfoBleak,
+    )
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+    from .witty_one.models import WittyOneStaticProperties
 
 type WittyOneConfigEntry = ConfigEntry[WittyOneDataUpdateCoordinator]
 
-MAX_RETRY = 4
+MAX_UPDATE_INTERVAL = timedelta(minutes=30)
+# Maximum delay in seconds for a command to be written and read back.
+COMMAND_TIMEOUT = 60
+# Interval of the checks of the advertisements while the breaker is open.
+PROBE_INTERVAL = timedelta(minutes=1)
+# No connection is tried to a charger not heard for this delay.
+PRESENCE_TIMEOUT = timedelta(minutes=5)
+# Shortest deadline of a poll, longer than the shortest update interval: a
+# slower poll only delays the next one, which is scheduled when it ends.
+MIN_POLL_TIMEOUT = 20.0
+
+
+def _changed_fields(
+    previous: WittyOneDevice | None, data: WittyOneDevice
+) -> frozenset[str]:
+    """Return the fields of `data` that differ from `previous`."""
+    return frozenset(
+        field.name
+        for field in dataclasses.fields(data)
+        if previous is None
+        or (
+            (value := getattr(data, field.name)) is not getattr(previous, field.name)
+            and value != getattr(previous, field.name)
+        )
+    )
 
 
 class WittyOneDataUpdateCoordinator(DataUpdateCoordinator[WittyOneDevice]):
     """Class to manage fetching data from the API."""
 
     config_entry: ConfigEntry
-    witty = WittyOneDeviceData(LOGGER)
 
-    previsous_data: WittyOneDevice | None = None
-    nb_error = 0
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the coordinator and the device data of the entry."""
+        options = config_entry.options
+        self.fast_interval = timedelta(
+            seconds=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL)
+        )
+        self.slow_interval = timedelta(
+            seconds=options.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL)
+        )
+        super().__init__(
+            hass=hass,
+            logger=LOGGER,
+            config_entry=config_entry,
+            name=DOMAIN,
+            update_interval=self.slow_interval,
+            always_update=False,
+        )
+        # Fields changed by the last update, entities using none of them
+        # do not write their state.
+        self.changed_fields: frozenset[str] = frozenset()
+        self.statistics = WittyOneStatistics(hass, config_entry, self.fast_interval)
+        # Fields of WittyOneDevice used by each entity, by unique id.
+        self.entity_fields: dict[str, frozenset[str]] = {}
+        self.previsous_data: WittyOneDevice | None = None
+        self.breaker = CircuitBreaker(
+            base_delay=self.fast_interval.total_seconds(),
+            max_delay=MAX_UPDATE_INTERVAL.total_seconds(),
+        )
+        # State of the breaker shown by the entities.
+        self.breaker_state = self.breaker.state
+        # The charger advertises, until Home Assistant reports it unavailable.
+        self.present = False
+        # Monotonic time of the last poll or notification received.
+        self.last_exchange = 0.0
+        # The presence is only checked once advertisements had time to come.
+        self._started = bluetooth.MONOTONIC_TIME()
+        self.scheduler = async_get_scheduler(hass)
+        self.router = WittyOneRouter(self.scheduler)
+        self.cache = WittyOneCache(
+            hass, config_entry.unique_id or config_entry.entry_id
+        )
+        self.device_static_properties: WittyOneStaticProperties | None = None
+        self.witty = WittyOneDeviceData(
+            LOGGER,
+            persistent=options.get(
+                CONF_PERSISTENT_CONNECTION, DEFAULT_PERSISTENT_CONNECTION
+            ),
+            idle_timeout=options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+            notify=options.get(CONF_NOTIFICATIONS, DEFAULT_NOTIFICATIONS),
+        )
+        if options.get(CONF_CAPTURE, DEFAULT_CAPTURE):
+            slug = slugify(config_entry.unique_id or config_entry.entry_id)
+            self.witty.capture = GattCapture(hass.config.path(DOMAIN, f"{slug}.jsonl"))
+        self.witty.on_update = self._async_handle_notification
+        self.witty.on_connect = self._async_handle_connect
+        self.witty.on_disconnect = self._async_release_slot
+        # Scanners hearing the charger for the poll running, and the source
+        # its slot and its statistics are accounted on.
+        self._candidates: list[BluetoothScannerDevice] = []
+        self._source: str | None = None
+
+    async def async_restore(self) -> None:
+        """Restore the cache of the device, the entities are created from it."""
+        await self.cache.async_load(self.witty, self.router)
+        await self.statistics.async_load()
+        self.device_static_properties = self.witty.static_properties
+        if self.witty.capture is not None:
+            # The static properties are read again to be in the capture.
+            self.witty.invalidate_cache()
+
+    @callback
+    def async_track_advertisements(self) -> CALLBACK_TYPE:
+        """Follow the presence of the charger, return the function to stop."""
+        address = self.config_entry.unique_id
+        if not address:
+            return lambda: None
+        unsubscribes = (
+            bluetooth.async_register_callback(
+                self.hass,
+                self._async_handle_advertisement,
+                BluetoothCallbackMatcher(address=address),
+                BluetoothScanningMode.PASSIVE,
+            ),
+            bluetooth.async_track_unavailable(
+                self.hass, self._async_handle_unavailable, address
+            ),
+        )
+
+        @callback
+        def _async_stop() -> None:
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+
+        return _async_stop
+
+    @property
+    def advertisement(self) -> BluetoothServiceInfoBleak | None:
+        """Return the last advertisement of the charger."""
+        if not (address := self.config_entry.unique_id):
+            return None
+        return bluetooth.async_last_service_info(self.hass, address)
+
+    @callback
+    def _async_handle_advertisement(
+        self, _service_info: BluetoothServiceInfoBleak, _change: BluetoothChange
+    ) -> None:
+        """Update the presence, only changed advertisements are received."""
+        if not self.present:
+            self.present = True
+            self._async_update_presence()
+
+    @callback
+    def _async_handle_unavailable(
+        self, _service_info: BluetoothServiceInfoBleak
+    ) -> None:
+        """Update the presence when the charger is no longer heard."""
+        self.present = False
+        self._async_update_presence()
+
+    @callback
+    def _async_update_presence(self) -> None:
+        """Update the entities, no field of the device changed."""
+        self.changed_fields = frozenset()
+        self.async_update_listeners()
+
+    @callback
+    def _async_heard_recently(self) -> bool:
+        """
+        Return True if the charger advertised or answered recently.
+
+        It is True during the first `PRESENCE_TIMEOUT` after the setup.
+        """
+        last_heard = max(self.last_exchange, self._started)
+        if (service_info := self.advertisement) is not None:
+            last_heard = max(last_heard, service_info.time)
+        return (
+            bluetooth.MONOTONIC_TIME() - last_heard < PRESENCE_TIMEOUT.total_seconds()
+        )
+
+    @callback
+    def _async_breaker_open(self) -> bool:
+        """
+        Return True if the breaker stays open.
+
+        Only the advertisements are checked, without using a connection slot.
+        """
+        if self.breaker.state is not BreakerState.OPEN:
+            return False
+        service_info = self.advertisement
+        return (
+            self.breaker.probe(
+                service_info.time if service_info else None,
+                bluetooth.MONOTONIC_TIME(),
+            )
+            is BreakerState.OPEN
+        )
+
+    @callback
+    def _async_update_device_info(self, static: WittyOneStaticProperties) -> None:
+        """Update the device once its static properties are read."""
+        if static == self.device_static_properties:
+            return
+        self.device_static_properties = static
+        dr.async_get(self.hass).async_get_or_create(
+            config_entry_id=self.config_entry.entry_id,
+            identifiers={(DOMAIN, self.config_entry.entry_id)},
+            manufacturer=MANUFACTURER,
+            name=static.name,
+            model=model_id_to_name(static.model),
+            model_id=static.model,
+        )
+
+    async def async_write(self, uuid: UUID, *values: Any) -> None:
+        """
+        Write the raw `values` to a configuration characteristic.
+
+        The write uses the open connection, or the one of an update requested
+        now, and is confirmed by reading the characteristic again. It fails at
+        once if no connection would be tried.
+        """
+        future = self.witty.queue_write(uuid, *values)
+        if self.witty.is_connected:
+            # Waits for a poll running, it may disconnect before the command.
+            await self.witty.run_commands()
+        if self.witty.has_commands:
+            if self._async_breaker_open() or not self._async_heard_recently():
+                future.cancel()
+                msg = "The charger is unreachable, the command is cancelled"
+                raise HomeAssistantError(msg)
+            await self.async_request_refresh()
+        try:
+            async with asyncio.timeout(COMMAND_TIMEOUT):
+                await future
+        except TimeoutError as err:
+            future.cancel()
+            msg = "The charger did not answer, the command is cancelled"
+            raise HomeAssistantError(msg) from err
+        except (BleakError, ParseError, CommandError) as err:
+            msg = f"Unable to write to the charger: {err}"
+            raise HomeAssistantError(msg) from err
+        if (data := self.witty.device) is not None and data is not self.data:
+            self._async_handle_notification(data)
+
+    async def async_shutdown(self) -> None:
+        """Cancel refresh, close the persistent connection, save statistics."""
+        await super().async_shutdown()
+        await self.witty.disconnect()
+        self.statistics.async_import()
+        await self.statistics.async_save()
+
+    @callback
+    def _async_handle_connect(self) -> None:
+        """Account the poll on the source the connection was made through."""
+        address = self.config_entry.unique_id
+        if not address:
+            return
+        for candidate in self._candidates:
+            allocations = candidate.scanner.get_allocations()
+            if allocations is not None and address in allocations.allocated:
+                source = candidate.scanner.source
+                break
+        else:
+            # The scanners do not report their connections, keep the expected one.
+            return
+        if source != self._source:
+            LOGGER.debug("Connected to %s through %s", address, source)
+            self._source = source
+            self.scheduler.move(address, source)
+            self.witty.concurrency = self.scheduler.read_concurrency(source)
+
+    @callback
+    def _async_release_slot(self) -> None:
+        """Give back the connection slot when the device is disconnected."""
+        if self.config_entry.unique_id:
+            self.scheduler.release(self.config_entry.unique_id)
+
+    @callback
+    def _async_handle_notification(self, data: WittyOneDevice) -> None:
+        """
+        Push data received by notification to the entities.
+
+        The refresh is not rescheduled (like `async_set_updated_data` does)
+        so characteristics without notification are still polled.
+        """
+        self.changed_fields = _changed_fields(self.data, data)
+        self.previsous_data = data
+        self.data = data
+        self.last_update_success = True
+        self.last_exchange = bluetooth.MONOTONIC_TIME()
+        self.breaker.record_success()
+        self._adapt_update_interval(data)
+        self._async_record_sample(data)
+        self.async_update_listeners()
 
     async def _async_update_data(self) -> Any:
-        """Update data via library."""
+        """Update data via library and find the fields that changed."""
+        data = await self._async_read_device()
+        self.changed_fields = _changed_fields(self.data, data)
+        return data
+
+    async def _async_read_device(self) -> WittyOneDevice:
+        """Read the device, or return the previous data on transient errors."""
         address = self.config_entry.unique_id
         if not address:
             msg = "No address found in configuration"
             raise ConfigEntryNotReady(msg)
 
+        if self.breaker.state is BreakerState.OPEN:
+            if self._async_breaker_open():
+                self.update_interval = PROBE_INTERVAL
+                msg = f"Witty One device {address} is unreachable, waiting for it"
+                raise UpdateFailed(msg)
+            LOGGER.debug("Device %s advertised again, trying to connect", address)
+
+        if not self.witty.is_connected and not self._async_heard_recently():
+            # The connection would time out, keep the slot for other chargers.
+            # The charger was not tried, the breaker does not count it, but
+            # its entities are unavailable until it is heard again.
+            self.update_interval = PROBE_INTERVAL
+            msg = f"Witty One device {address} not heard for {PRESENCE_TIMEOUT}"
+            raise UpdateFailed(msg)
+
         LOGGER.debug("Updating data from %s ", address)
 
-        await close_stale_connections_by_address(address)
+        metrics = self.witty.metrics
+        if not self.witty.is_connected:
+            with metrics.measure("stale_cleanup"):
+                await close_stale_connections_by_address(address)
 
-        ble_device = bluetooth.async_ble_device_from_address(self.hass, address)
-        if not ble_device:
-            self.nb_error += 1
-            if self.nb_error < MAX_RETRY and self.previsous_data:
-                LOGGER.warning("Device not found, using previous data")
-                return self.previsous_data
-            msg = f"Could not find Witty One device with address {address}"
-            raise ConfigEntryError(msg)
+        candidates = self.router.rank(
+            bluetooth.async_scanner_devices_by_address(self.hass, address)
+        )
+        if not candidates:
+            return self._async_handle_failure(
+                f"Could not find Witty One device with address {address}"
+            )
+        route = candidates[0]
+        # An open connection keeps the slot of its source.
+        source = self.scheduler.source_of(address) if self.witty.is_connected else None
+        if source is None:
+            source = route.scanner.source
 
+        # Wait for a free slot on the adapter or proxy expected to be used,
+        # the Bluetooth client of Home Assistant may connect through another
+        # one, the slot is moved once connected.
+        with metrics.measure("slot_wait"):
+            await self.scheduler.acquire(source, address)
+
+        self._candidates = candidates
+        self._source = source
+        self._async_configure_poll(source)
         try:
-            data = await self.witty.update_device(ble_device)
-        except Exception as err:
-            self.nb_error += 1
-            if self.nb_error < MAX_RETRY and self.previsous_data:
-                LOGGER.warning("Error updating device, using previous data: %s", err)
-                return self.previsous_data
-            msg = f"Unable to fetch data: {err}"
-            raise UpdateFailed(msg) from err
+            data = await self.witty.update_device(route.ble_device)
+        except Exception as err:  # noqa: BLE001 raised again once the breaker opens
+            self.router.record(self._source or source, success=False, latency=None)
+            return self._async_handle_failure(f"Unable to fetch data: {err}", err)
+        finally:
+            if not self.witty.is_connected:
+                self._async_release_slot()
+            self.cache.async_save(self.witty, self.router)
+            if (capture := self.witty.capture) is not None and capture.pending:
+                reads, capture.pending = capture.pending, []
+                await self.hass.async_add_executor_job(capture.write, reads)
 
         self.previsous_data = data
-        self.nb_error = 0
+        self.last_exchange = bluetooth.MONOTONIC_TIME()
+        self.router.record(
+            self._source or source, success=True, latency=metrics.phases["poll"].last
+        )
+        self.breaker.record_success()
+        self._adapt_update_interval(data)
+        self._async_record_sample(data)
+        self._async_update_device_info(data.static_information)
         return data
+
+    @callback
+    def _async_configure_poll(self, source: str) -> None:
+        """Set the fields, deadline and read concurrency of the next poll."""
+        fields = self._async_enabled_fields()
+        if self.data is not None and self.data.general.mainstate in ACTIVE_MAINSTATES:
+            # The electrical statistics are recorded while charging.
+            fields |= {"phases_states"}
+        self.witty.fields = fields
+        # The poll ends within the update interval, unless the interval is
+        # shorter than the time a connection and a full read may need.
+        interval = (self.update_interval or MAX_UPDATE_INTERVAL).total_seconds()
+        self.witty.poll_timeout = max(
+            MIN_POLL_TIMEOUT, min(interval, DEFAULT_POLL_TIMEOUT)
+        )
+        # The chargers of a proxy share its limit of reads in flight.
+        self.witty.concurrency = self.scheduler.read_concurrency(source)
+
+    @callback
+    def _async_handle_failure(
+        self, msg: str, err: Exception | None = None
+    ) -> WittyOneDevice:
+        """
+        Back off after a failure.
+
+        The previous data is kept until the breaker opens, then the update
+        fails and the entities are unavailable.
+        """
+        self.breaker.record_failure(bluetooth.MONOTONIC_TIME())
+        breaker = self.breaker
+        if breaker.state is BreakerState.OPEN:
+            LOGGER.warning(
+                "%s, no connection for %.0f s and until the device is seen again",
+                msg,
+                (breaker.retry_at or 0) - (breaker.opened_at or 0),
+            )
+            self.update_interval = PROBE_INTERVAL
+            raise UpdateFailed(msg) from err
+        interval = (
+            self.slow_interval
+            if self.previsous_data is None
+            else self._update_interval_for(self.previsous_data)
+        )
+        self.update_interval = max(interval, timedelta(seconds=breaker.backoff()))
+        if self.previsous_data is None:
+            raise UpdateFailed(msg) from err
+        LOGGER.warning("%s, using previous data", msg)
+        return self.previsous_data
+
+    @callback
+    def _async_refresh_finished(self) -> None:
+        """Update the entities when only the state of the breaker changed."""
+        super()._async_refresh_finished()
+        if self.breaker.state is not self.breaker_state:
+            self.breaker_state = self.breaker.state
+            self.async_update_listeners()
+
+    @callback
+    def _async_record_sample(self, data: WittyOneDevice) -> None:
+        """Add the electrical values read or received while charging."""
+        if (
+            data.general.mainstate in ACTIVE_MAINSTATES
+            and "phases_states" in self.witty.updated_fields
+        ):
+            self.statistics.history.append(time.time(), data.phases_states)
+
+    @callback
+    def _async_enabled_fields(self) -> frozenset[str]:
+        """Return the fields of the device used by the enabled entities."""
+        return frozenset().union(
+            *(
+                self.entity_fields.get(entry.unique_id, frozenset())
+                for entry in er.async_entries_for_config_entry(
+                    er.async_get(self.hass), self.config_entry.entry_id
+                )
+                if not entry.disabled
+            )
+        )
+
+    def _adapt_update_interval(self, data: WittyOneDevice) -> None:
+        """Poll faster while the charger is active."""
+        self.update_interval = self._update_interval_for(data)
+
+    def _update_interval_for(self, data: WittyOneDevice) -> timedelta:
+        """Return the interval of the polls without failure."""
+        return (
+            self.fast_interval
+            if data.general.mainstate in ACTIVE_MAINSTATES
+            else self.slow_interval
+        )
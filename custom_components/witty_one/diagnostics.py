@@ -0,0 +1,94 @@
+"""Diagnostics support for witty_one."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import bluetooth
+from homeassistant.components.diagnostics import async_redact_data
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import WittyOneConfigEntry
+
+TO_REDACT = {"badge"}
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, frozenset | set):
+        return sorted(value)
+    return value
+
+
+def _dict_factory(items: list[tuple[str, Any]]) -> dict[str, Any]:
+    return {key: _value(value) for key, value in items}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: WittyOneConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data.coordinator
+    witty = coordinator.witty
+    advertisement = coordinator.advertisement
+    return {
+        "entry": {
+            "title": entry.title,
+            "unique_id": entry.unique_id,
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": repr(coordinator.last_exception),
+            "update_interval": str(coordinator.update_interval),
+            "breaker": coordinator.breaker.as_dict(),
+            "changed_fields": sorted(coordinator.changed_fields),
+        },
+        "connection": {
+            "connected": witty.is_connected,
+            "persistent": witty.persistent,
+            "paired": witty.paired,
+            "poll_timeout": witty.poll_timeout,
+            "expired_polls": witty.expired_polls,
+            "read_concurrency": witty.concurrency.as_dict(),
+            "notifying": sorted(str(uuid) for uuid in witty.notifying),
+            "handles": {str(uuid): handle for uuid, handle in witty.handles.items()},
+        },
+        "advertisement": {
+            "present": coordinator.present,
+            "source": advertisement.source,
+            "rssi": advertisement.rssi,
+            "seconds_ago": bluetooth.MONOTONIC_TIME() - advertisement.time,
+            "connectable": advertisement.connectable,
+            "manufacturer_data": {
+                str(company): data.hex()
+                for company, data in advertisement.manufacturer_data.items()
+            },
+            "service_data": {
+                uuid: data.hex() for uuid, data in advertisement.service_data.items()
+            },
+            "service_uuids": advertisement.service_uuids,
+        }
+        if advertisement is not None
+        else {"present": coordinator.present},
+        "routes": {
+            "best": coordinator.router.best,
+            "held": coordinator.scheduler.source_of(entry.unique_id or ""),
+            "sources": {
+                source: dataclasses.asdict(stats)
+                for source, stats in coordinator.router.stats.items()
+            },
+        },
+        "timings_ms": witty.metrics.as_dict(),
+        "data": async_redact_data(
+            dataclasses.asdict(coordinator.data, dict_factory=_dict_factory)
+            if coordinator.data is not None
+            else None,
+            TO_REDACT,
+        ),
+    }
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import (
     CONNECTION_BLUETOOTH,
     DeviceInfo,
@@ -17,19 +18,59 @@ class WittyOneEntity(CoordinatorEntity[WittyOneDataUpdateCoordinator]):
     """Define a base WittyOne Entity."""
 
     _attr_has_entity_name = True
+    # Fields of WittyOneDevice used by the entity, None for all of them.
+    _device_fields: frozenset[str] | None = None
+    _last_available: bool | None = None
 
-    def __init__(self, coordinator: WittyOneDataUpdateCoordinator, suffix: str) -> None:
-        """Initialize."""
+    def __init__(
+        self,
+        coordinator: WittyOneDataUpdateCoordinator,
+        suffix: str,
+        device_fields: frozenset[str] | None = None,
+    ) -> None:
+        """Initialize, `device_fields` are the fields of WittyOneDevice used."""
         super().__init__(coordinator)
 
         self._attr_unique_id = f"{coordinator.config_entry.unique_id}_{suffix}"
-        self._attr_device_info = DeviceInfo(
+        self._device_fields = device_fields
+        # Only the fields of the enabled entities are read.
+        coordinator.entity_fields[self._attr_unique_id] = device_fields or frozenset()
+        device_info = DeviceInfo(
             connections={
                 (CONNECTION_BLUETOOTH, (str)(coordinator.config_entry.unique_id))
             },
             identifiers={(DOMAIN, coordinator.config_entry.entry_id)},
             manufacturer=MANUFACTURER,
-            name=coordinator.data.static_information.name,
-            model=model_id_to_name(coordinator.data.static_information.model),
-            model_id=coordinator.data.static_information.model,
+            name=coordinator.config_entry.title,
         )
+        # Without cache, the device is updated by the coordinator once read.
+        if (static := coordinator.device_static_properties) is not None:
+            device_info.update(
+                name=static.name,
+                model=model_id_to_name(static.model),
+                model_id=static.model,
+            )
+        self._attr_device_info = device_info
+
+    @property
+    def available(self) -> bool:
+        """Return False if a field used by the entity could not be read."""
+        data = self.coordinator.data
+        return super().available and (
+            data is None
+            or self._device_fields is None
+            or self._device_fields.isdisjoint(data.stale_fields)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the availability or a used field changed."""
+        available = self.available
+        if (
+            available == self._last_available
+            and self._device_fields is not None
+            and self._device_fields.isdisjoint(self.coordinator.changed_fields)
+        ):
+            return
+        self._last_available = available
+        super()._handle_coordinator_update()
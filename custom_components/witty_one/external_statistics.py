@@ -0,0 +1,161 @@
+"""Hourly long-term statistics of the electrical samples of a charger."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import (
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfFrequency,
+    UnitOfPower,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+from homeassistant.util.unit_conversion import (
+    ElectricCurrentConverter,
+    ElectricPotentialConverter,
+    PowerConverter,
+)
+
+from .const import DOMAIN, LOGGER
+from .witty_one.history import CHANNELS, HOUR, ElectricalHistory
+
+if TYPE_CHECKING:
+    from datetime import datetime, timedelta
+
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import CALLBACK_TYPE
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+# Hours of samples allocated at first: the hour being imported and the
+# current one. The history grows if notifications add more samples.
+BUFFERED_HOURS = 2
+
+# Unit and unit class of the statistics of each kind of channel.
+UNITS: dict[str, tuple[str, str | None]] = {
+    "voltage": (UnitOfElectricPotential.VOLT, ElectricPotentialConverter.UNIT_CLASS),
+    "current": (UnitOfElectricCurrent.AMPERE, ElectricCurrentConverter.UNIT_CLASS),
+    "active_power": (UnitOfPower.WATT, PowerConverter.UNIT_CLASS),
+    "frequency": (UnitOfFrequency.HERTZ, None),
+}
+
+
+class WittyOneStatistics:
+    """
+    Keep the electrical samples of a charger in memory.
+
+    They are imported each hour as the mean, min and max of the hour in
+    external statistics, the recorder states are not used. The samples not
+    imported yet are saved when Home Assistant stops or the entry unloads.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, config_entry: ConfigEntry, interval: timedelta
+    ) -> None:
+        """Initialize an empty history for samples every `interval`."""
+        self.hass = hass
+        self.history = ElectricalHistory(
+            int(BUFFERED_HOURS * HOUR // interval.total_seconds()) + 1
+        )
+        self._imported_until = self.history.keep_after = 0.0
+        prefix = slugify(config_entry.unique_id or config_entry.entry_id)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{prefix}_statistics"
+        )
+        self._metadata = [
+            (
+                name,
+                StatisticMetaData(
+                    mean_type=StatisticMeanType.ARITHMETIC,
+                    has_sum=False,
+                    name=f"{config_entry.title} {name.replace('_', ' ')}",
+                    source=DOMAIN,
+                    statistic_id=f"{DOMAIN}:{prefix}_{name}",
+                    unit_class=UNITS[attribute][1],
+                    unit_of_measurement=UNITS[attribute][0],
+                ),
+            )
+            for name, _, attribute in CHANNELS
+        ]
+
+    async def async_load(self) -> None:
+        """Restore the samples not imported before the last stop."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        try:
+            imported_until = float(data["imported_until"])
+            self.history.restore(data.get("samples", {"timestamps": []}))
+        except KeyError, TypeError, ValueError, IndexError:
+            LOGGER.warning("Ignore invalid saved statistics")
+            return
+        self._imported_until = self.history.keep_after = imported_until
+
+    async def async_save(self) -> None:
+        """Save the samples not imported yet."""
+        await self._store.async_save(self._data())
+
+    async def async_remove(self) -> None:
+        """Remove the saved samples."""
+        await self._store.async_remove()
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "imported_until": self._imported_until,
+            "samples": self.history.samples(self._imported_until),
+        }
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Import the statistics of the hour that ended, each hour."""
+        return async_track_time_change(
+            self.hass, self._async_import_hour, minute=0, second=30
+        )
+
+    @callback
+    def _async_import_hour(self, _now: datetime) -> None:
+        now = time.time()
+        self.async_import(now - now % HOUR)
+
+    @callback
+    def async_import(self, until: float | None = None) -> None:
+        """
+        Import the statistics of the samples not imported before `until`.
+
+        Without `until`, the current hour is imported too, it is imported
+        again when complete.
+        """
+        end = time.time() if until is None else until
+        hours = list(self.history.hourly(self._imported_until, end))
+        if not hours:
+            return
+        LOGGER.debug("Import %s hours of electrical statistics", len(hours))
+        for name, metadata in self._metadata:
+            async_add_external_statistics(
+                self.hass,
+                metadata,
+                [
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(hour),
+                        mean=statistics[name][0],
+                        min=statistics[name][1],
+                        max=statistics[name][2],
+                    )
+                    for hour, statistics in hours
+                ],
+            )
+        if until is not None:
+            self._imported_until = self.history.keep_after = until
+            self._store.async_delay_save(self._data, SAVE_DELAY)
@@ -0,0 +1,108 @@
+"""Choice of the adapter or proxy used to connect to a charger."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from homeassistant.components.bluetooth import BluetoothScannerDevice
+
+    from .scheduler import WittyOneConnectionScheduler
+
+# Weight of the outcome of the last connections in the moving averages.
+SMOOTHING = 0.2
+# Bonus in dB of a source where every connection succeeds, compared to a
+# source where they all fail.
+SUCCESS_WEIGHT = 30.0
+# Penalty in dB for each second of poll through a source.
+LATENCY_WEIGHT = 5.0
+# Polls through a source before it is remembered as the best one.
+MIN_ATTEMPTS = 3
+
+
+@dataclass
+class SourceStats:
+    """Moving averages of the polls of a charger through one source."""
+
+    # Unknown sources are neither preferred nor avoided.
+    success_rate: float = 0.5
+    # Duration of the polls in seconds, None until one succeeds.
+    latency: float | None = None
+    attempts: int = 0
+
+    def record(self, *, success: bool, latency: float | None) -> None:
+        """Add the outcome of a poll."""
+        self.attempts += 1
+        self.success_rate += SMOOTHING * (success - self.success_rate)
+        if success and latency is not None:
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.latency + SMOOTHING * (latency - self.latency)
+            )
+
+
+class WittyOneRouter:
+    """
+    Rank the adapters and proxies hearing a charger.
+
+    Sources without free connection slot come last, the others are ordered
+    by the RSSI of their last advertisement, with a bonus for the sources
+    where the polls of the charger succeed and a penalty for slow ones.
+    """
+
+    def __init__(self, scheduler: WittyOneConnectionScheduler) -> None:
+        """Initialize without statistics."""
+        self.scheduler = scheduler
+        self.stats: dict[str, SourceStats] = {}
+
+    def rank(
+        self, candidates: list[BluetoothScannerDevice]
+    ) -> list[BluetoothScannerDevice]:
+        """Return the connectable candidates, the best one first."""
+        return sorted(candidates, key=self._key, reverse=True)
+
+    def _key(self, candidate: BluetoothScannerDevice) -> tuple[bool, float]:
+        source = candidate.scanner.source
+        free = self.scheduler.free_slots(source) > 0
+        if (allocations := candidate.scanner.get_allocations()) is not None:
+            free = free and allocations.free > 0
+        return free, self.score(source, candidate.advertisement.rssi)
+
+    def score(self, source: str, rssi: int) -> float:
+        """Return the score of a source, in dB."""
+        stats = self.stats.get(source, SourceStats())
+        latency = stats.latency or 0.0
+        return rssi + SUCCESS_WEIGHT * stats.success_rate - LATENCY_WEIGHT * latency
+
+    def record(self, source: str, *, success: bool, latency: float | None) -> None:
+        """Add the outcome of a poll through `source`."""
+        self.stats.setdefault(source, SourceStats()).record(
+            success=success, latency=latency
+        )
+
+    @property
+    def best(self) -> str | None:
+        """Return the source with the best success rate."""
+        known = [
+            (stats.success_rate, source)
+            for source, stats in self.stats.items()
+            if stats.attempts >= MIN_ATTEMPTS
+        ]
+        return max(known)[1] if known else None
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the statistics, rounded so they are not saved after each poll."""
+        return {
+            source: {
+                "success_rate": round(stats.success_rate, 1),
+                "latency": None if stats.latency is None else round(stats.latency, 1),
+                "attempts": min(stats.attempts, MIN_ATTEMPTS),
+            }
+            for source, stats in self.stats.items()
+        }
+
+    def restore(self, data: dict[str, dict[str, Any]]) -> None:
+        """Restore the statistics saved by `as_dict`."""
+        self.stats = {source: SourceStats(**stats) for source, stats in data.items()}
@@ -0,0 +1,134 @@
+"""Connection scheduler shared by all the Witty One chargers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, MAX_CONNECTIONS_PER_SOURCE, STAGGER_DELAY
+from .witty_one.concurrency import ReadConcurrency
+
+DATA_SCHEDULER: HassKey[WittyOneConnectionScheduler] = HassKey(f"{DOMAIN}_scheduler")
+
+
+@dataclass
+class _Source:
+    """Connections of one adapter or proxy."""
+
+    active: set[str] = field(default_factory=set)
+    waiters: deque[tuple[str, asyncio.Future[None]]] = field(default_factory=deque)
+    next_start: float = 0.0
+    concurrency: ReadConcurrency = field(default_factory=ReadConcurrency)
+
+
+class WittyOneConnectionScheduler:
+    """
+    Share the connection slots of each Bluetooth adapter or proxy.
+
+    At most `max_connections` chargers are connected through the same source,
+    the others wait in a FIFO queue so each charger gets its turn. Two
+    connections on the same source start at least `stagger` seconds apart.
+    The chargers of a source share the limit of the GATT reads in flight.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS_PER_SOURCE,
+        stagger: float = STAGGER_DELAY,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.max_connections = max_connections
+        self.stagger = stagger
+        self._sources: defaultdict[str, _Source] = defaultdict(_Source)
+        self._holders: dict[str, str] = {}
+
+    def free_slots(self, source: str) -> int:
+        """Return the number of slots of `source` nobody holds or waits for."""
+        if (queue := self._sources.get(source)) is None:
+            return self.max_connections
+        return max(0, self.max_connections - len(queue.active) - len(queue.waiters))
+
+    def source_of(self, address: str) -> str | None:
+        """Return the source where the charger `address` holds a slot."""
+        return self._holders.get(address)
+
+    def read_concurrency(self, source: str) -> ReadConcurrency:
+        """Return the limit of the GATT reads in flight through `source`."""
+        return self._sources[source].concurrency
+
+    async def acquire(self, source: str, address: str) -> None:
+        """Wait for a connection slot on `source` for the charger `address`."""
+        holder = self._holders.get(address)
+        if holder == source:
+            return
+        if holder is not None:
+            self.release(address)
+
+        queue = self._sources[source]
+        loop = asyncio.get_running_loop()
+        if queue.waiters or len(queue.active) >= self.max_connections:
+            waiter = loop.create_future()
+            queue.waiters.append((address, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.release(address)
+                else:
+                    queue.waiters.remove((address, waiter))
+                raise
+        else:
+            queue.active.add(address)
+            self._holders[address] = source
+
+        now = loop.time()
+        delay = queue.next_start - now
+        queue.next_start = max(now, queue.next_start) + self.stagger
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.release(address)
+                raise
+
+    @callback
+    def move(self, address: str, source: str) -> None:
+        """
+        Account the connection of the charger `address` on `source`.
+
+        The connection is already open through `source`, its slot is taken
+        even if the source has no free one.
+        """
+        if self._holders.get(address) == source:
+            return
+        self.release(address)
+        self._sources[source].active.add(address)
+        self._holders[address] = source
+
+    @callback
+    def release(self, address: str) -> None:
+        """Give back the slot of the charger `address`, if it has one."""
+        source = self._holders.pop(address, None)
+        if source is None:
+            return
+        queue = self._sources[source]
+        queue.active.discard(address)
+        while queue.waiters and len(queue.active) < self.max_connections:
+            waiter_address, waiter = queue.waiters.popleft()
+            if waiter.cancelled():
+                continue
+            queue.active.add(waiter_address)
+            self._holders[waiter_address] = source
+            waiter.set_result(None)
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> WittyOneConnectionScheduler:
+    """Return the scheduler shared by all the config entries."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = WittyOneConnectionScheduler()
+    return scheduler
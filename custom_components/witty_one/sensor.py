@@ -3,16 +3,36 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from operator import attrgetter
 from typing import TYPE_CHECKING
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorEntity,
     SensorEntityDescription,
 )
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
-from homeassistant.const import UnitOfEnergy, UnitOfPower, UnitOfTime
+from homeassistant.const import (
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import callback
 
 from .entity import WittyOneEntity
+from .witty_one.breaker import BreakerState
+from .witty_one.const import (
+    MAINSTATE_CHARGING,
+    MAINSTATE_ERROR,
+    MAINSTATE_FINISH,
+    MAINSTATE_IDLE,
+    MAINSTATE_RESERVED,
+    MAINSTATE_WAIT,
+    MAINSTATE_WAIT_ENERGY,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -33,17 +53,32 @@ class WittyOneSensorEntityDescription(SensorEntityDescription):
     """Describes WLED sensor entity."""
 
     exists_fn: Callable[[WittyOneDevice], bool] = lambda _: True
+    # Field of WittyOneDevice read by value_fn.
+    device_field: str
     value_fn: Callable[[WittyOneDevice], datetime | StateType]
 
 
+@dataclass(frozen=True, kw_only=True)
+class WittyOneTimingSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor of the median duration of a phase of the polls."""
+
+    phase: str
+    native_unit_of_measurement: str | None = UnitOfTime.MILLISECONDS
+    device_class: SensorDeviceClass | None = SensorDeviceClass.DURATION
+    state_class: SensorStateClass | str | None = SensorStateClass.MEASUREMENT
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
+    suggested_display_precision: int | None = 0
+
+
 GENERAL_STATES = {
-    1: "idle",  # 256
-    2: "wait",  # 512
-    4: "wait_energy",  # 1024
-    6: "charging",  # 1536
-    8: "finish",  # 2048
-    16: "reserved",  # 4096
-    15728640: "error",
+    MAINSTATE_IDLE: "idle",  # 256
+    MAINSTATE_WAIT: "wait",  # 512
+    MAINSTATE_WAIT_ENERGY: "wait_energy",  # 1024
+    MAINSTATE_CHARGING: "charging",  # 1536
+    MAINSTATE_FINISH: "finish",  # 2048
+    MAINSTATE_RESERVED: "reserved",  # 4096
+    MAINSTATE_ERROR: "error",
 }
 
 ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
@@ -53,6 +88,7 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
+        device_field="energies",
         value_fn=lambda device: device.energies[3].active_import_energy,
     ),
     WittyOneSensorEntityDescription(
@@ -61,6 +97,7 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
+        device_field="energies",
         value_fn=lambda device: device.energies[0].active_import_energy,
     ),
     WittyOneSensorEntityDescription(
@@ -69,6 +106,7 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
+        device_field="energies",
         value_fn=lambda device: device.energies[1].active_import_energy,
     ),
     WittyOneSensorEntityDescription(
@@ -77,6 +115,7 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
+        device_field="energies",
         value_fn=lambda device: device.energies[2].active_import_energy,
     ),
     WittyOneSensorEntityDescription(
@@ -84,6 +123,7 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         translation_key="current_session_energy",
         native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
+        device_field="current_session",
         value_fn=lambda device: device.current_session.energy,
     ),
     WittyOneSensorEntityDescription(
@@ -92,6 +132,7 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
+        device_field="phases_states",
         value_fn=lambda device: device.phases_states[3].active_power,
     ),
     WittyOneSensorEntityDescription(
@@ -99,6 +140,7 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         translation_key="current_session_duration",
         native_unit_of_measurement=UnitOfTime.SECONDS,
         device_class=SensorDeviceClass.DURATION,
+        device_field="current_session",
         value_fn=lambda device: device.current_session.duration,
     ),
     WittyOneSensorEntityDescription(
@@ -106,8 +148,122 @@ ENTITY_DESCRIPTIONS: tuple[WittyOneSensorEntityDescription, ...] = (
         translation_key="state",
         device_class=SensorDeviceClass.ENUM,
         options=list(GENERAL_STATES.values()),
+        device_field="general",
         value_fn=lambda device: GENERAL_STATES[device.general.mainstate],
     ),
+    WittyOneSensorEntityDescription(
+        key="ambient_temperature",
+        translation_key="ambient_temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_field="ambient_temp",
+        value_fn=lambda device: device.ambient_temp.value,
+    ),
+    WittyOneSensorEntityDescription(
+        key="relay_temperature",
+        translation_key="relay_temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_field="relay_temp",
+        value_fn=lambda device: device.relay_temp.value,
+    ),
+    WittyOneSensorEntityDescription(
+        key="other_temperature",
+        translation_key="other_temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_field="unk_temp",
+        value_fn=lambda device: device.unk_temp.value,
+    ),
+    WittyOneSensorEntityDescription(
+        key="car_detect",
+        translation_key="car_detect",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_field="car_detect",
+        value_fn=lambda device: device.car_detect,
+    ),
+    WittyOneSensorEntityDescription(
+        key="cable_lock",
+        translation_key="cable_lock",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_field="cable_lock",
+        value_fn=lambda device: device.cable_lock,
+    ),
+    # The meaning of the following counters is not known.
+    *(
+        WittyOneSensorEntityDescription(
+            key=f"duration_{index}",
+            translation_key="duration",
+            translation_placeholders={"index": str(index)},
+            native_unit_of_measurement=UnitOfTime.SECONDS,
+            device_class=SensorDeviceClass.DURATION,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+            device_field="durations",
+            value_fn=attrgetter(f"durations.duration_{index}"),
+        )
+        for index in range(1, 5)
+    ),
+    *(
+        WittyOneSensorEntityDescription(
+            key=f"commutation_{index}",
+            translation_key="commutation",
+            translation_placeholders={"index": str(index)},
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+            device_field="commutations",
+            value_fn=attrgetter(f"commutations.commutation_{index}"),
+        )
+        for index in range(1, 5)
+    ),
+    *(
+        WittyOneSensorEntityDescription(
+            key=f"connection_state_{index}",
+            translation_key="connection_state",
+            translation_placeholders={"index": str(index)},
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+            device_field="connection_state",
+            value_fn=attrgetter(f"connection_state.state_{index}"),
+        )
+        for index in range(1, 7)
+    ),
+)
+
+
+TIMING_DESCRIPTIONS: tuple[WittyOneTimingSensorEntityDescription, ...] = (
+    WittyOneTimingSensorEntityDescription(
+        key="poll_duration",
+        translation_key="poll_duration",
+        phase="poll",
+    ),
+    WittyOneTimingSensorEntityDescription(
+        key="slot_wait_duration",
+        translation_key="slot_wait_duration",
+        phase="slot_wait",
+    ),
+    WittyOneTimingSensorEntityDescription(
+        key="connect_duration",
+        translation_key="connect_duration",
+        phase="connect",
+    ),
+    WittyOneTimingSensorEntityDescription(
+        key="pair_duration",
+        translation_key="pair_duration",
+        phase="pair",
+    ),
 )
 
 
@@ -124,11 +280,21 @@ async def async_setup_entry(
             entity_description=entity_description,
         )
         for entity_description in ENTITY_DESCRIPTIONS
-        if entity_description.exists_fn(coordinator.data)
+        if coordinator.data is None or entity_description.exists_fn(coordinator.data)
+    )
+    async_add_entities(
+        WittyOneTimingSensor(
+            coordinator=coordinator,
+            entity_description=entity_description,
+        )
+        for entity_description in TIMING_DESCRIPTIONS
+    )
+    async_add_entities(
+        [WittyOneBreakerSensor(coordinator), WittyOneRssiSensor(coordinator)]
     )
 
 
-class WittyOneSensor(WittyOneEntity, SensorEntity):
+class WittyOneSensor(WittyOneEntity, RestoreSensor):
     """witty_one Sensor class."""
 
     entity_description: WittyOneSensorEntityDescription
@@ -139,10 +305,117 @@ class WittyOneSensor(WittyOneEntity, SensorEntity):
         entity_description: WittyOneSensorEntityDescription,
     ) -> None:
         """Initialize the sensor class."""
-        super().__init__(coordinator, entity_description.key)
+        super().__init__(
+            coordinator,
+            entity_description.key,
+            frozenset({entity_description.device_field}),
+        )
         self.entity_description = entity_description
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value until the device is read."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is None and (
+            last_data := await self.async_get_last_sensor_data()
+        ):
+            self._attr_native_value = last_data.native_value
+
     @property
     def native_value(self) -> datetime | StateType:
         """Return the native value of the sensor."""
+        if self.coordinator.data is None:
+            return self._attr_native_value
         return self.entity_description.value_fn(self.coordinator.data)
+
+
+class WittyOneTimingSensor(WittyOneEntity, SensorEntity):
+    """Median duration of a phase of the last polls, see diagnostics for more."""
+
+    entity_description: WittyOneTimingSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: WittyOneDataUpdateCoordinator,
+        entity_description: WittyOneTimingSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, entity_description.key)
+        self.entity_description = entity_description
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the median duration in ms."""
+        histogram = self.coordinator.witty.metrics.phases.get(
+            self.entity_description.phase
+        )
+        if histogram is None or (median := histogram.quantile(0.5)) is None:
+            return None
+        return median * 1000
+
+
+class WittyOneBreakerSensor(WittyOneEntity, SensorEntity):
+    """State of the circuit breaker of the connections to the charger."""
+
+    entity_description = SensorEntityDescription(
+        key="breaker",
+        translation_key="breaker",
+        device_class=SensorDeviceClass.ENUM,
+        options=list(BreakerState),
+        entity_category=EntityCategory.DIAGNOSTIC,
+    )
+
+    def __init__(self, coordinator: WittyOneDataUpdateCoordinator) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, self.entity_description.key, frozenset())
+        self._attr_native_value = coordinator.breaker.state
+
+    @property
+    def available(self) -> bool:
+        """Return True, the breaker is open when the charger is unreachable."""
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the breaker changed."""
+        if self.coordinator.breaker.state == self._attr_native_value:
+            return
+        self._attr_native_value = self.coordinator.breaker.state
+        self.async_write_ha_state()
+
+
+class WittyOneRssiSensor(WittyOneEntity, SensorEntity):
+    """Signal strength of the last advertisement of the charger."""
+
+    entity_description = SensorEntityDescription(
+        key="rssi",
+        translation_key="rssi",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    )
+
+    def __init__(self, coordinator: WittyOneDataUpdateCoordinator) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, self.entity_description.key, frozenset())
+        self._attr_native_value = self._rssi()
+
+    @property
+    def available(self) -> bool:
+        """Return True if the charger advertises."""
+        return self.coordinator.present
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the presence or the signal changed."""
+        rssi = self._rssi()
+        if rssi == self._attr_native_value and self.available == self._last_available:
+            return
+        self._attr_native_value = rssi
+        self._last_available = self.available
+        self.async_write_ha_state()
+
+    def _rssi(self) -> int | None:
+        advertisement = self.coordinator.advertisement
+        return advertisement.rssi if advertisement is not None else None
@@ -0,0 +1,83 @@
+"""Cache of the bond, static properties, handles and routes of a charger."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import DOMAIN, LOGGER
+from .witty_one.models import WittyOneStaticProperties
+
+if TYPE_CHECKING:
+    from .routing import WittyOneRouter
+    from .witty_one import WittyOneDeviceData
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+class WittyOneCache:
+    """What is read once from a charger, kept between restarts."""
+
+    def __init__(self, hass: HomeAssistant, address: str) -> None:
+        """Initialize the cache of the charger `address`."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(address)}"
+        )
+        self._saved: dict[str, Any] = {}
+
+    async def async_load(
+        self, witty: WittyOneDeviceData, router: WittyOneRouter
+    ) -> None:
+        """Restore the cache in the device data and the router."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        try:
+            static_properties = (
+                WittyOneStaticProperties(**data["static_properties"])
+                if "static_properties" in data
+                else None
+            )
+            handles = {
+                UUID(uuid): int(handle)
+                for uuid, handle in data.get("handles", {}).items()
+            }
+            router.restore(data.get("routes", {}))
+        except TypeError, ValueError, AttributeError:
+            LOGGER.warning("Ignore invalid cache %s", data)
+            return
+        self._saved = data
+        witty.paired = bool(data.get("paired"))
+        if static_properties is not None:
+            witty.restore(static_properties, handles)
+
+    @callback
+    def async_save(self, witty: WittyOneDeviceData, router: WittyOneRouter) -> None:
+        """Save the cache of the device data and the router if it changed."""
+        data = self._data(witty, router)
+        if data == self._saved:
+            return
+        self._saved = data
+        self._store.async_delay_save(lambda: data, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the cache."""
+        await self._store.async_remove()
+
+    @staticmethod
+    def _data(witty: WittyOneDeviceData, router: WittyOneRouter) -> dict[str, Any]:
+        # The bond is kept when the static properties are invalidated.
+        if witty.static_properties is None:
+            return {"paired": witty.paired, "routes": router.as_dict()}
+        return {
+            "paired": witty.paired,
+            "routes": router.as_dict(),
+            "static_properties": dataclasses.asdict(witty.static_properties),
+            "handles": {str(uuid): handle for uuid, handle in witty.handles.items()},
+        }
@@ -0,0 +1,99 @@
+"""Switch platform for witty_one."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
+from homeassistant.const import EntityCategory
+
+from .entity import WittyOneEntity
+from .witty_one.const import CONFIG_CABLE_LOCK_UUID
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from uuid import UUID
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from custom_components.witty_one.witty_one.parser import WittyOneDevice
+
+    from .coordinator import WittyOneDataUpdateCoordinator
+    from .data import WittyOneConfigEntry
+
+
+@dataclass(frozen=True, kw_only=True)
+class WittyOneSwitchEntityDescription(SwitchEntityDescription):
+    """Describes a switch writing a configuration characteristic."""
+
+    # Field of WittyOneDevice read by value_fn.
+    device_field: str
+    value_fn: Callable[[WittyOneDevice], bool]
+    uuid: UUID
+    on_value: int = 1
+    off_value: int = 0
+
+
+ENTITY_DESCRIPTIONS: tuple[WittyOneSwitchEntityDescription, ...] = (
+    WittyOneSwitchEntityDescription(
+        key="config_cable_lock",
+        translation_key="config_cable_lock",
+        entity_category=EntityCategory.CONFIG,
+        device_field="config_cable_lock",
+        value_fn=lambda device: bool(device.config_cable_lock),
+        uuid=CONFIG_CABLE_LOCK_UUID,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: WittyOneConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the switch platform."""
+    async_add_entities(
+        WittyOneSwitch(
+            coordinator=entry.runtime_data.coordinator,
+            entity_description=entity_description,
+        )
+        for entity_description in ENTITY_DESCRIPTIONS
+    )
+
+
+class WittyOneSwitch(WittyOneEntity, SwitchEntity):
+    """Switch writing a configuration characteristic of the charger."""
+
+    entity_description: WittyOneSwitchEntityDescription
+
+    def __init__(
+        self,
+        coordinator: WittyOneDataUpdateCoordinator,
+        entity_description: WittyOneSwitchEntityDescription,
+    ) -> None:
+        """Initialize the switch class."""
+        super().__init__(
+            coordinator,
+            entity_description.key,
+            frozenset({entity_description.device_field}),
+        )
+        self.entity_description = entity_description
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return the value read from the charger."""
+        if self.coordinator.data is None:
+            return None
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    async def async_turn_on(self, **_kwargs: Any) -> None:
+        """Write the on value, it is read back before returning."""
+        description = self.entity_description
+        await self.coordinator.async_write(description.uuid, description.on_value)
+
+    async def async_turn_off(self, **_kwargs: Any) -> None:
+        """Write the off value, it is read back before returning."""
+        description = self.entity_description
+        await self.coordinator.async_write(description.uuid, description.off_value)
@@ -0,0 +1,87 @@
+"""
+Poll Witty One chargers without Home Assistant.
+
+Run from the root of the repository with
+`PYTHONPATH=custom_components/witty_one python -m witty_one ADDRESS...`.
+Each decoded snapshot is written as a JSON line on the standard output (or
+`--output FILE`) and the last values are served in Prometheus text format
+on `http://HOST:PORT/metrics`. As with the integration, put each charger
+in pairing mode with its card before the first poll. A charger must not be
+polled by Home Assistant through the same adapter.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import sys
+
+from .collector import DEFAULT_CONCURRENCY, DEFAULT_INTERVAL, WittyOneCollector
+
+DEFAULT_METRICS_PORT = 9750
+
+
+async def _run(args: argparse.Namespace) -> None:
+    collector = WittyOneCollector(
+        args.addresses,
+        interval=args.interval,
+        concurrency=args.concurrency,
+        persistent=args.persistent,
+    )
+    server = None
+    if args.metrics_port:
+        server = await collector.serve_metrics(args.metrics_host, args.metrics_port)
+    with (
+        open(args.output, "a", encoding="utf-8")  # noqa: ASYNC230, PTH123 appended line by line
+        if args.output
+        else contextlib.nullcontext(sys.stdout)
+    ) as output:
+        try:
+            await collector.run(output)
+        finally:
+            if server is not None:
+                server.close()
+
+
+def main() -> None:
+    """Run the collector until interrupted."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("addresses", metavar="ADDRESS", nargs="+")
+    parser.add_argument(
+        "-i", "--interval", type=float, default=DEFAULT_INTERVAL, help="in seconds"
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="chargers connected at the same time",
+    )
+    parser.add_argument(
+        "--persistent",
+        action="store_true",
+        help="keep the connections open between polls",
+    )
+    parser.add_argument("-o", "--output", metavar="FILE", help="append the snapshots")
+    parser.add_argument("--metrics-host", default="127.0.0.1")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=DEFAULT_METRICS_PORT,
+        help="0 to disable the Prometheus endpoint",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    # The standard output is used by the snapshots.
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
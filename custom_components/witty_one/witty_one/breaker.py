@@ -0,0 +1,99 @@
+"""Backoff and circuit breaker of the connections to a charger."""
+
+import random
+from enum import StrEnum
+
+FAILURE_THRESHOLD = 4
+BASE_DELAY = 30.0
+MAX_DELAY = 1800.0
+# Part of the delay removed at random so chargers failing together spread out.
+JITTER = 0.25
+
+
+class BreakerState(StrEnum):
+    """State of the circuit breaker."""
+
+    # The charger is polled normally.
+    CLOSED = "closed"
+    # Only the advertisements of the charger are checked.
+    OPEN = "open"
+    # One connection is tried, the breaker closes if it succeeds.
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Delay the connections to a charger after failures.
+
+    After each failure the next attempt waits twice as long, with jitter. After
+    `threshold` consecutive failures the breaker opens: no connection is tried
+    until the delay elapsed and the charger advertised again, then one
+    connection is tried (half open) which closes or opens the breaker again.
+    """
+
+    def __init__(
+        self,
+        threshold: int = FAILURE_THRESHOLD,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        jitter: float = JITTER,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._random = rng or random.Random()  # noqa: S311 not used for security
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.retry_at: float | None = None
+
+    def backoff(self) -> float:
+        """Return the delay in seconds before the next attempt."""
+        if not self.failures:
+            return 0.0
+        delay = min(self.base_delay * 2 ** (self.failures - 1), self.max_delay)
+        return delay * (1 - self.jitter * self._random.random())
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_at = self.retry_at = None
+
+    def record_failure(self, now: float) -> None:
+        """Count a failure at `now`, open the breaker after too many of them."""
+        self.failures += 1
+        if self.state is BreakerState.HALF_OPEN or self.failures >= self.threshold:
+            self.state = BreakerState.OPEN
+            self.opened_at = now
+            self.retry_at = now + self.backoff()
+
+    def probe(self, last_seen: float | None, now: float) -> BreakerState:
+        """
+        Half open the breaker if the charger can be tried again.
+
+        `last_seen` is the time of the last advertisement of the charger, it
+        must have been received since the breaker opened.
+        """
+        if (
+            self.state is BreakerState.OPEN
+            and self.opened_at is not None
+            and self.retry_at is not None
+            and now >= self.retry_at
+            and last_seen is not None
+            and last_seen >= self.opened_at
+        ):
+            self.state = BreakerState.HALF_OPEN
+        return self.state
+
+    def as_dict(self) -> dict[str, str | int | float | None]:
+        """Return the state of the breaker."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_at": self.opened_at,
+            "retry_at": self.retry_at,
+        }
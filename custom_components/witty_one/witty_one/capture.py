@@ -0,0 +1,187 @@
+"""Capture of the raw GATT reads and replay of a capture without charger."""
+
+import dataclasses
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from bleak.exc import BleakError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from bleak.backends.device import BLEDevice
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CapturedRead:
+    """A raw buffer read from a characteristic at `timestamp`."""
+
+    timestamp: float
+    uuid: UUID
+    data: bytes
+
+    def to_json(self) -> str:
+        """Return the read as a line of a JSONL capture."""
+        item = {
+            "ts": round(self.timestamp, 3),
+            "uuid": str(self.uuid),
+            "data": self.data.hex(),
+        }
+        return json.dumps(item, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> CapturedRead:
+        """Return the read of a line of a JSONL capture."""
+        item = json.loads(line)
+        return cls(item["ts"], UUID(item["uuid"]), bytes.fromhex(item["data"]))
+
+
+class GattCapture:
+    """
+    Record the raw buffers read, to write them to a JSONL capture file.
+
+    `record` only keeps the read in memory, `write` (blocking) appends the
+    reads recorded since the last write to the file.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize a capture appending to `path`."""
+        self.path = Path(path)
+        self.pending: list[CapturedRead] = []
+        self.count = 0
+
+    def record(self, uuid: UUID, data: bytes | bytearray) -> None:
+        """Record a buffer read from the characteristic `uuid`."""
+        self.pending.append(CapturedRead(time.time(), uuid, bytes(data)))
+
+    def write(self, reads: Iterable[CapturedRead] | None = None) -> None:
+        """Append `reads` (by default the pending ones) to the file."""
+        if reads is None:
+            reads, self.pending = self.pending, []
+        lines = [read.to_json() + "\n" for read in reads]
+        if not lines:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            file.writelines(lines)
+        self.count += len(lines)
+
+
+def read_capture(path: str | Path) -> Iterator[CapturedRead]:
+    """Return the reads of a JSONL capture file."""
+    with Path(path).open(encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield CapturedRead.from_json(line)
+
+
+@dataclasses.dataclass(frozen=True)
+class ReplayCharacteristic:
+    """A characteristic of a replayed charger."""
+
+    uuid: UUID
+    handle: int
+    properties: tuple[str, ...] = ("read",)
+
+
+class ReplayCharger:
+    """
+    A charger answering the reads with the buffers of a capture.
+
+    Each characteristic returns its captured buffers in order, a read fails
+    with a `BleakError` once they are all used. `connect` has the signature of
+    the connector of `WittyOneDeviceData`.
+    """
+
+    def __init__(self, reads: Iterable[CapturedRead]) -> None:
+        """Initialize the charger with the reads of a capture."""
+        self.buffers: defaultdict[UUID, deque[bytes]] = defaultdict(deque)
+        for read in reads:
+            self.buffers[read.uuid].append(read.data)
+        self.characteristics = {
+            uuid: ReplayCharacteristic(uuid, handle)
+            for handle, uuid in enumerate(self.buffers, start=16)
+        }
+        self.reads = 0
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of buffers not read yet."""
+        return sum(len(buffers) for buffers in self.buffers.values())
+
+    async def connect(
+        self,
+        ble_device: BLEDevice,
+        disconnected_callback: Callable[[ReplayClient], None],
+    ) -> ReplayClient:
+        """Open a connection to the charger."""
+        return ReplayClient(self, ble_device, disconnected_callback)
+
+
+class _ReplayServices:
+    def __init__(self, charger: ReplayCharger) -> None:
+        self.by_uuid = charger.characteristics
+        self.characteristics = {
+            characteristic.handle: characteristic
+            for characteristic in self.by_uuid.values()
+        }
+
+    def get_characteristic(self, specifier: UUID | int) -> ReplayCharacteristic | None:
+        if isinstance(specifier, int):
+            return self.characteristics.get(specifier)
+        return self.by_uuid.get(specifier)
+
+
+class ReplayClient:
+    """The subset of `BleakClient` used by the parser, replaying a capture."""
+
+    def __init__(
+        self,
+        charger: ReplayCharger,
+        ble_device: BLEDevice,
+        disconnected_callback: Callable[[ReplayClient], None],
+    ) -> None:
+        """Initialize a connected client."""
+        self.charger = charger
+        self.address = ble_device.address
+        self.services = _ReplayServices(charger)
+        self.is_connected = True
+        self._disconnected_callback = disconnected_callback
+
+    async def pair(self) -> bool:
+        """Pair with the charger, the capture is already decrypted."""
+        return True
+
+    async def clear_cache(self) -> bool:
+        """Clear the services cache, there is nothing to clear."""
+        return True
+
+    async def disconnect(self) -> bool:
+        """Close the connection."""
+        if self.is_connected:
+            self.is_connected = False
+            self._disconnected_callback(self)
+        return True
+
+    async def read_gatt_char(
+        self, specifier: ReplayCharacteristic | int | UUID
+    ) -> bytearray:
+        """Return the next captured buffer of the characteristic."""
+        characteristic = (
+            specifier
+            if isinstance(specifier, ReplayCharacteristic)
+            else self.services.get_characteristic(specifier)
+        )
+        if characteristic is None:
+            msg = f"Characteristic {specifier} not found"
+            raise BleakError(msg)
+        buffers = self.charger.buffers[characteristic.uuid]
+        if not buffers:
+            msg = f"No more captured reads of {characteristic.uuid}"
+            raise BleakError(msg)
+        self.charger.reads += 1
+        return bytearray(buffers.popleft())
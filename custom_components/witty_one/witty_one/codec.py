@@ -0,0 +1,347 @@
+"""Decoding of Witty One characteristics."""
+
+import dataclasses
+import struct
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .const import (
+    AMBIENT_TEMP_UUID,
+    CABLE_LOCK_UUID,
+    CAR_DETECT_UUID,
+    CHARGING_NUMBER_UUID,
+    COMMUTATION_UUID,
+    CONFIG_CABLE_LOCK_UUID,
+    CONNECTION_STATE_UUID,
+    DATE_STR_UUID,
+    DURATIONS_UUID,
+    ELECTRIC_STATE_UUID,
+    ENERGY_UUID,
+    HMI_BOARD_VERSION_UUID,
+    MAIN_BOARD_VERSION_UUID,
+    MODEL_UUID,
+    NAME_UUID,
+    PACKAGE_VERSION_UUID,
+    RELAY_TEMP_UUID,
+    RF_BOARD_VERSION_UUID,
+    SESSION_STATE_UUID,
+    STARTUP_COUNT_UUID,
+    STATE_UUID,
+    UNK_TEMP_UUID,
+)
+from .models import (
+    WittyCurrentSession,
+    WittyOneCommutations,
+    WittyOneConnectionState,
+    WittyOneDurations,
+    WittyOneGeneralState,
+    WittyOnePhaseEnergy,
+    WittyOnePhaseState,
+    WittyOneTemperature,
+    WittyOneVersion,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from uuid import UUID
+
+
+class ParseError(Exception):
+    """Error during parse."""
+
+
+class Decoded(NamedTuple):
+    """Raw values of a buffer and the object(s) decoded from them."""
+
+    raw: Any
+    value: Any
+
+
+class Codec:
+    """
+    Decode the buffer of one characteristic.
+
+    The buffer starts with its length (`<H`) followed by the values of `fmt`.
+    The values are split in `records`, each one gives the field names of one
+    `target` object (an empty name skips the value). Fields in `scaled` are
+    divided by `scale`. A tuple is returned when there is more than one record.
+    """
+
+    __slots__ = ("_defaults", "_many", "_plan", "name", "struct", "target")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        fmt: str,
+        target: Callable[..., Any],
+        records: Sequence[Sequence[str]],
+        *,
+        scale: float = 1,
+        scaled: frozenset[str] = frozenset(),
+    ) -> None:
+        """Precompile the format and the arguments of each record."""
+        self.name = name
+        self.struct = struct.Struct("<H" + fmt)
+        self.target = target
+        self._many = len(records) > 1
+
+        nb_values = len(self.struct.unpack_from(bytes(self.struct.size)))
+        if nb_values != 1 + sum(len(record) for record in records):
+            msg = f"{name}: {fmt} does not match the fields"
+            raise ValueError(msg)
+
+        # Arguments are given by position, the fields of a dataclass missing
+        # from a record take their default value, stored after the raw values.
+        defaults: list[Any] = []
+        plan = []
+        start = 1
+        for record in records:
+            indexes = {field: start + i for i, field in enumerate(record) if field}
+            if dataclasses.is_dataclass(target):
+                names = [field.name for field in dataclasses.fields(target)]
+                for field in dataclasses.fields(target):
+                    if field.name not in indexes:
+                        indexes[field.name] = nb_values + len(defaults)
+                        defaults.append(field.default)
+            else:
+                names = list(indexes)
+            args = tuple(
+                (indexes[field], scale if field in scaled else None) for field in names
+            )
+            plan.append((start, start + len(record), args))
+            start += len(record)
+        self._plan: tuple[
+            tuple[int, int, tuple[tuple[int, float | None], ...]], ...
+        ] = tuple(plan)
+        self._defaults = tuple(defaults)
+
+    def unpack(self, buffer: bytes | bytearray | memoryview) -> tuple[Any, ...]:
+        """Return the raw values of the buffer, without copying it."""
+        try:
+            return self.struct.unpack_from(buffer)
+        except struct.error as err:
+            msg = (
+                f"witty_one for {self.name} {self.struct.format} receive "
+                f"buffer[{len(buffer)}] {bytes(buffer).hex()}"
+            )
+            raise ParseError(msg) from err
+
+    def decode(self, buffer: bytes | bytearray | memoryview) -> Any:
+        """Return the object(s) decoded from the buffer."""
+        return self.refresh(buffer).value
+
+    def encode(self, *values: Any) -> bytes:
+        """Return the buffer of the raw values, to be written."""
+        try:
+            return self.struct.pack(self.struct.size - 2, *values)
+        except struct.error as err:
+            msg = f"witty_one for {self.name} {self.struct.format} cannot pack {values}"
+            raise ParseError(msg) from err
+
+    def refresh(
+        self, buffer: bytes | bytearray | memoryview, previous: Decoded | None = None
+    ) -> Decoded:
+        """
+        Decode the buffer, sharing what did not change since `previous`.
+
+        `previous` itself is returned when the values are the same, and the
+        objects of the records with the same values are reused.
+        """
+        raw = self.unpack(buffer)
+        if previous is not None and previous.raw == raw:
+            return previous
+
+        values = raw + self._defaults
+        target = self.target
+        old_raw = previous.raw if previous is not None else ()
+        old_objects = (
+            ()
+            if previous is None
+            else previous.value
+            if self._many
+            else (previous.value,)
+        )
+        objects = tuple(
+            old_objects[i]
+            if old_raw[start:stop] == raw[start:stop]
+            else target(
+                *[
+                    values[index] / scale if scale else values[index]
+                    for index, scale in args
+                ]
+            )
+            for i, (start, stop, args) in enumerate(self._plan)
+        )
+        return Decoded(raw, objects if self._many else objects[0])
+
+
+class StringCodec:
+    """Decode a string: its length (`<H`) followed by the text."""
+
+    __slots__ = ("name",)
+
+    _length = struct.Struct("<H")
+
+    def __init__(self, name: str) -> None:
+        """Initialize the codec."""
+        self.name = name
+
+    def decode(self, buffer: bytes | bytearray | memoryview) -> str:
+        """Return the string decoded from the buffer."""
+        return self.refresh(buffer).value
+
+    def refresh(
+        self, buffer: bytes | bytearray | memoryview, previous: Decoded | None = None
+    ) -> Decoded:
+        """Decode the buffer, `previous` is returned if the text did not change."""
+        view = memoryview(buffer)
+        try:
+            (length,) = self._length.unpack_from(view)
+            text = bytes(view[2 : 2 + length])
+            if previous is not None and previous.raw == text:
+                return previous
+            return Decoded(text, text.rstrip(b"\0").decode("utf-8"))
+        except (struct.error, UnicodeDecodeError) as err:
+            msg = (
+                f"witty_one for {self.name}, receive buffer[{len(view)}] "
+                f"{view.hex()} for a string"
+            )
+            raise ParseError(msg) from err
+
+
+def _value(value: Any) -> Any:
+    return value
+
+
+def _general_state(state: int) -> WittyOneGeneralState:
+    return WittyOneGeneralState(mainstate=state >> 8, substate=state & 0xFF)
+
+
+def _version(major: int, minor: int, patch: int, build: int) -> WittyOneVersion:
+    return WittyOneVersion(app=f"{major}.{minor}.{patch}.{build}")
+
+
+def _board_version(  # noqa: PLR0913
+    major: int,
+    minor: int,
+    patch: int,
+    build: int,
+    boot_major: int,
+    boot_minor: int,
+    boot_patch: int,
+    boot_build: int,
+) -> WittyOneVersion:
+    return WittyOneVersion(
+        app=f"{major}.{minor}.{patch}.{build}",
+        boot=f"{boot_major}.{boot_minor}.{boot_patch}.{boot_build}",
+    )
+
+
+_PHASE_ENERGY = (
+    "active_import_energy",
+    "active_export_energy",
+    "reactive_import_energy",
+    "reactive_export_energy",
+    "apparent_energy",
+)
+_PHASE_STATE = (
+    "voltage",
+    "current",
+    "active_power",
+    "apparent_power",
+    "reactive_power",
+    "power_factor",
+    "cos_phi",
+    "quadrant",
+)
+_TOTAL_STATE = (
+    "active_power",
+    "apparent_power",
+    "reactive_power",
+    "power_factor",
+    "cos_phi",
+    "quadrant",
+    "frequency",
+)
+_VERSION = ("major", "minor", "patch", "build")
+_BOARD_VERSION = (*_VERSION, "", "boot_major", "boot_minor", "boot_patch", "boot_build")
+_TEMPERATURE = ("value", "minimum", "maximum")
+
+
+def _temperature(name: str) -> Codec:
+    return Codec(
+        name,
+        "hhh",
+        WittyOneTemperature,
+        (_TEMPERATURE,),
+        scale=100,
+        scaled=frozenset(_TEMPERATURE),
+    )
+
+
+def _board(name: str) -> Codec:
+    return Codec(name, "BBBBBBBBB", _board_version, (_BOARD_VERSION,))
+
+
+CODECS: dict[UUID, Codec | StringCodec] = {
+    NAME_UUID: StringCodec("name"),
+    MODEL_UUID: StringCodec("model"),
+    DATE_STR_UUID: StringCodec("date"),
+    PACKAGE_VERSION_UUID: Codec(
+        "package_version", "BBBBB", _version, ((*_VERSION, ""),)
+    ),
+    MAIN_BOARD_VERSION_UUID: _board("main_board_version"),
+    RF_BOARD_VERSION_UUID: _board("rf_board_version"),
+    HMI_BOARD_VERSION_UUID: _board("hmi_board_version"),
+    STATE_UUID: Codec("general_state", "I", _general_state, (("state",),)),
+    STARTUP_COUNT_UUID: Codec("startup_count", "I", _value, (("value",),)),
+    DURATIONS_UUID: Codec(
+        "durations",
+        "IIII",
+        WittyOneDurations,
+        (("duration_1", "duration_2", "duration_3", "duration_4"),),
+    ),
+    COMMUTATION_UUID: Codec(
+        "commutation",
+        "QQQQ",
+        WittyOneCommutations,
+        (("commutation_1", "commutation_2", "commutation_3", "commutation_4"),),
+    ),
+    # The length of the payload is 4 bytes, not enough for a Q.
+    CAR_DETECT_UUID: Codec("car_detect", "I", _value, (("value",),)),
+    CHARGING_NUMBER_UUID: Codec("charging_number", "I", _value, (("value",),)),
+    CABLE_LOCK_UUID: Codec("cable_lock", "H", _value, (("value",),)),
+    ENERGY_UUID: Codec(
+        "energy",
+        "Q" * 20,
+        WittyOnePhaseEnergy,
+        (_PHASE_ENERGY,) * 4,
+        scale=1000,
+        scaled=frozenset(_PHASE_ENERGY),
+    ),
+    ELECTRIC_STATE_UUID: Codec(
+        "phases_state",
+        "l" * 31,
+        WittyOnePhaseState,
+        (_PHASE_STATE, _PHASE_STATE, _PHASE_STATE, _TOTAL_STATE),
+        scale=1000,
+        scaled=frozenset(_PHASE_STATE + _TOTAL_STATE) - {"quadrant"},
+    ),
+    AMBIENT_TEMP_UUID: _temperature("ambient_temp"),
+    RELAY_TEMP_UUID: _temperature("relay_temp"),
+    UNK_TEMP_UUID: _temperature("unk_temp"),
+    CONNECTION_STATE_UUID: Codec(
+        "connection_state",
+        "HHHHHH",
+        WittyOneConnectionState,
+        (("state_1", "state_2", "state_3", "state_4", "state_5", "state_6"),),
+    ),
+    SESSION_STATE_UUID: Codec(
+        "current_session",
+        "L7sLQB7s",
+        WittyCurrentSession,
+        (("start", "unk1", "duration", "energy", "unk3", "badge"),),
+        scale=1000,
+        scaled=frozenset({"energy"}),
+    ),
+    CONFIG_CABLE_LOCK_UUID: Codec("config_cable_lock", "B", _value, (("value",),)),
+}
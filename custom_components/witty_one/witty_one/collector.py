@@ -0,0 +1,293 @@
+"""Poll several chargers from one event loop, without Home Assistant."""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import time
+from functools import partial
+from typing import IO, TYPE_CHECKING, Any
+
+from bleak import BleakScanner
+from bleak.exc import BleakError
+
+from .codec import ParseError
+from .parser import DEFAULT_POLL_TIMEOUT, WittyOneDeviceData
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable, Iterator
+
+    from bleak import BleakClient
+    from bleak.backends.device import BLEDevice
+    from bleak.backends.scanner import AdvertisementData
+
+    from .models import WittyOneDevice
+
+DEFAULT_INTERVAL = 30.0
+# Chargers polled at the same time, each one needs a connection slot of the
+# Bluetooth adapter.
+DEFAULT_CONCURRENCY = 2
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRIC_PREFIX = "witty_one"
+
+
+@dataclasses.dataclass
+class ChargerStatus:
+    """A polled charger and the outcome of its polls."""
+
+    address: str
+    data: WittyOneDeviceData
+    device: WittyOneDevice | None = None
+    polls: int = 0
+    failures: int = 0
+    # Wall clock time of the end of the last successful poll.
+    last_success: float | None = None
+    # Duration in seconds of the last poll.
+    duration: float | None = None
+    last_error: str | None = None
+    # Whether the charger holds a connection slot of the collector.
+    slot: bool = False
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, bytes | bytearray):
+        return value.hex()
+    if isinstance(value, frozenset | set):
+        return sorted(value)
+    msg = f"{type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+def snapshot(address: str, device: WittyOneDevice, timestamp: float) -> str:
+    """Return a decoded device as a JSON line (without the line feed)."""
+    item = {"ts": round(timestamp, 3), "address": address}
+    item |= dataclasses.asdict(device)
+    return json.dumps(item, default=_json_default, separators=(",", ":"))
+
+
+def _samples(
+    value: Any, name: str, labels: dict[str, str]
+) -> Iterator[tuple[str, dict[str, str], float]]:
+    """Return the numeric values of a field of the device, as samples."""
+    if dataclasses.is_dataclass(value):
+        for field in dataclasses.fields(value):
+            yield from _samples(
+                getattr(value, field.name), f"{name}_{field.name}", labels
+            )
+    elif isinstance(value, tuple):
+        # One item per phase.
+        for index, item in enumerate(value, start=1):
+            yield from _samples(item, name, labels | {"phase": str(index)})
+    elif isinstance(value, int | float):
+        yield name, labels, float(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _line(name: str, labels: dict[str, str], value: float) -> str:
+    text = ",".join(f'{key}="{_escape(item)}"' for key, item in labels.items())
+    return f"{name}{{{text}}} {value!r}"
+
+
+def prometheus_metrics(chargers: Iterable[ChargerStatus]) -> str:
+    """Return the values and the poll statistics in Prometheus text format."""
+    metrics: dict[str, tuple[str, list[str]]] = {}
+
+    def add(name: str, kind: str, labels: dict[str, str], value: float) -> None:
+        metrics.setdefault(f"{METRIC_PREFIX}_{name}", (kind, []))[1].append(
+            _line(f"{METRIC_PREFIX}_{name}", labels, value)
+        )
+
+    for charger in chargers:
+        labels = {"address": charger.address}
+        add("polls_total", "counter", labels, charger.polls)
+        add("poll_failures_total", "counter", labels, charger.failures)
+        add("connected", "gauge", labels, float(charger.data.is_connected))
+        if charger.polls:
+            success = charger.last_error is None
+            add("last_poll_success", "gauge", labels, float(success))
+        if charger.duration is not None:
+            add("poll_duration_seconds", "gauge", labels, charger.duration)
+        if charger.last_success is not None:
+            add("last_success_timestamp_seconds", "gauge", labels, charger.last_success)
+        if charger.device is None:
+            continue
+        for field in dataclasses.fields(charger.device):
+            for name, sample_labels, value in _samples(
+                getattr(charger.device, field.name), field.name, labels
+            ):
+                add(name, "gauge", sample_labels, value)
+
+    lines = []
+    for name, (kind, samples) in metrics.items():
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class WittyOneCollector:
+    """
+    Poll chargers every `interval` seconds and write each decoded snapshot.
+
+    At most `concurrency` chargers are connected at the same time, the
+    others wait for their turn. A persistent connection keeps its slot until
+    it is closed, it is closed after a poll when another charger waits. The
+    chargers are found by a Bluetooth scan, unless their `BLEDevice` is put
+    in `devices`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        addresses: Iterable[str],
+        *,
+        interval: float = DEFAULT_INTERVAL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        persistent: bool = False,
+        logger: logging.Logger | None = None,
+        connector: Callable[
+            [BLEDevice, Callable[[BleakClient], None]], Awaitable[BleakClient]
+        ]
+        | None = None,
+    ) -> None:
+        """Initialize the collector of the chargers at `addresses`."""
+        self.logger = logger or logging.getLogger(__name__)
+        self.interval = interval
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._waiting = 0
+        options: dict[str, Any] = {
+            "persistent": persistent,
+            # A poll never runs into the next one.
+            "poll_timeout": min(interval, DEFAULT_POLL_TIMEOUT),
+        }
+        if connector is not None:
+            options["connector"] = connector
+        self.chargers = {
+            address.upper(): ChargerStatus(
+                address.upper(), WittyOneDeviceData(self.logger, **options)
+            )
+            for address in addresses
+        }
+        for charger in self.chargers.values():
+            charger.data.on_disconnect = partial(self._release, charger)
+        self.devices: dict[str, BLEDevice] = {}
+
+    async def _acquire(self, charger: ChargerStatus) -> None:
+        if charger.slot:
+            return
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        charger.slot = True
+
+    def _release(self, charger: ChargerStatus) -> None:
+        if charger.slot:
+            charger.slot = False
+            self._semaphore.release()
+
+    def _on_advertisement(
+        self, device: BLEDevice, _advertisement: AdvertisementData
+    ) -> None:
+        if device.address.upper() in self.chargers:
+            self.devices[device.address.upper()] = device
+
+    async def poll(self, charger: ChargerStatus) -> WittyOneDevice | None:
+        """Poll a charger once, return None if it fails."""
+        await self._acquire(charger)
+        try:
+            charger.polls += 1
+            if (ble_device := self.devices.get(charger.address)) is None:
+                charger.failures += 1
+                charger.last_error = "not found by the scan"
+                return None
+            start = time.perf_counter()
+            try:
+                device = await charger.data.update_device(ble_device)
+            except Exception as err:  # noqa: BLE001 the other chargers are still polled
+                charger.failures += 1
+                charger.last_error = str(err) or type(err).__name__
+                self.logger.warning(
+                    "Fail to poll %s: %s",
+                    charger.address,
+                    err,
+                    # Only an unexpected error needs its traceback.
+                    exc_info=not isinstance(
+                        err, (BleakError, ParseError, TimeoutError)
+                    ),
+                )
+                return None
+            finally:
+                charger.duration = time.perf_counter() - start
+        finally:
+            if charger.data.is_connected and self._waiting:
+                # The slot goes to the charger waiting for it.
+                await charger.data.disconnect()
+            if not charger.data.is_connected:
+                self._release(charger)
+        charger.device = device
+        charger.last_success = time.time()
+        charger.last_error = None
+        return device
+
+    async def _poll_forever(
+        self, charger: ChargerStatus, delay: float, output: IO[str]
+    ) -> None:
+        await asyncio.sleep(delay)
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            if (device := await self.poll(charger)) is not None:
+                output.write(snapshot(charger.address, device, time.time()) + "\n")
+                output.flush()
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - start)))
+
+    async def run(self, output: IO[str], *, scan: bool = True) -> None:
+        """Poll the chargers until cancelled, writing JSON lines to `output`."""
+        scanner = None
+        if scan:
+            scanner = BleakScanner(detection_callback=self._on_advertisement)
+            await scanner.start()
+        # The first polls are spread over the interval.
+        step = self.interval / max(1, len(self.chargers))
+        try:
+            async with asyncio.TaskGroup() as group:
+                for index, charger in enumerate(self.chargers.values()):
+                    group.create_task(self._poll_forever(charger, index * step, output))
+        finally:
+            if scanner is not None:
+                await scanner.stop()
+            for charger in self.chargers.values():
+                await charger.data.disconnect()
+
+    async def _handle_http(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await reader.readline()
+            # The headers are not used.
+            while await reader.readline() not in (b"\r\n", b"\n", b""):
+                pass
+            method, path, *_ = request.decode("latin-1").split() or ["", ""]
+            if method == "GET" and path.split("?")[0] in ("/", "/metrics"):
+                status = "200 OK"
+                body = prometheus_metrics(self.chargers.values()).encode()
+            else:
+                status = "404 Not Found"
+                body = b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {PROMETHEUS_CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (ConnectionError, ValueError) as err:
+            self.logger.debug("Invalid metrics request: %s", err)
+        finally:
+            writer.close()
+
+    async def serve_metrics(self, host: str, port: int) -> asyncio.Server:
+        """Serve the Prometheus metrics on `host`:`port`."""
+        return await asyncio.start_server(self._handle_http, host, port)
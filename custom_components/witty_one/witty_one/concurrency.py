@@ -0,0 +1,116 @@
+"""Number of GATT reads in flight, adapted to the adapter or proxy."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+MAX_CONCURRENCY = 4
+INITIAL_CONCURRENCY = 2
+# Weight of the last batch in the moving averages of the throughput.
+SMOOTHING = 0.3
+# Batches without error before the concurrency is changed again.
+STABLE_BATCHES = 5
+# Smallest batch telling something about the concurrency.
+MIN_BATCH = 2
+# Most batches without error before a limit that failed is tried again.
+MAX_RETRY_BATCHES = 200
+
+
+class ReadConcurrency:
+    """
+    Limit the GATT reads in flight and learn the best limit.
+
+    Each batch of reads reports its size, duration and whether a read failed.
+    On an error the reads become serial and the limit that failed is banned,
+    it is tried again after `STABLE_BATCHES` batches without error, twice as
+    many after each new failure. Every `STABLE_BATCHES` batches, the limit
+    with the best throughput (reads per second) is kept, or the next one is
+    tried when the current limit is the best known.
+    """
+
+    def __init__(
+        self,
+        max_limit: int = MAX_CONCURRENCY,
+        initial: int = INITIAL_CONCURRENCY,
+    ) -> None:
+        """Initialize with `initial` reads in flight."""
+        self.max_limit = max_limit
+        self.limit = min(initial, max_limit)
+        # Highest limit tried, lowered after an error.
+        self.ceiling = max_limit
+        self.throughput: dict[int, float] = {}
+        self.errors = 0
+        # Errors at each limit, they delay its next try.
+        self.failures: dict[int, int] = {}
+        self._batches = 0
+        self._stable = 0
+        self._active = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait until a read can be sent, for the duration of the block."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            async with self._condition:
+                self._condition.notify_all()
+
+    def record_batch(self, reads: int, duration: float, *, error: bool) -> None:
+        """Add the outcome of `reads` reads done in `duration` seconds."""
+        if error:
+            self.errors += 1
+            self.failures[self.limit] = self.failures.get(self.limit, 0) + 1
+            self.ceiling = max(1, self.limit - 1)
+            self.throughput.pop(self.limit, None)
+            self.limit = 1
+            self._batches = self._stable = 0
+            return
+        if reads < MIN_BATCH or duration <= 0:
+            return
+        if self.failures.get(self.limit):
+            # The limit works again, its next failure is not delayed as much.
+            self.failures[self.limit] -= 1
+        rate = reads / duration
+        previous = self.throughput.get(self.limit)
+        self.throughput[self.limit] = (
+            rate if previous is None else previous + SMOOTHING * (rate - previous)
+        )
+        self._batches += 1
+        self._stable += 1
+        if self._batches < STABLE_BATCHES:
+            return
+        self._batches = 0
+        allowed = [limit for limit in self.throughput if limit <= self.ceiling]
+        best = max(allowed, key=self.throughput.__getitem__)
+        if best != self.limit:
+            self.limit = best
+        elif self.limit < self.ceiling:
+            self.limit += 1
+        elif self.ceiling < self.max_limit and self._stable >= self._retry_after():
+            # Stable long enough, the limit that failed can be tried again.
+            self.ceiling += 1
+
+    def _retry_after(self) -> int:
+        """Return the batches without error before the ceiling is raised."""
+        failures = self.failures.get(self.ceiling + 1, 0)
+        return min(STABLE_BATCHES * 2**failures, MAX_RETRY_BATCHES)
+
+    def as_dict(self) -> dict[str, int | dict[int, int] | dict[int, float]]:
+        """Return the limit and the throughput of each limit tried."""
+        return {
+            "limit": self.limit,
+            "ceiling": self.ceiling,
+            "errors": self.errors,
+            "failures": dict(sorted(self.failures.items())),
+            "reads_per_s": {
+                limit: round(rate, 1) for limit, rate in sorted(self.throughput.items())
+            },
+        }
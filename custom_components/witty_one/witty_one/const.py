@@ -58,3 +58,15 @@ CONFIG_BADGE_UUID = _state_uuid("2180")
 
 #  MAC (6 bytes), NAME 32 bytes, STATE 1 byte
 CONFIG_ADMIN_PHONES_UUID = _state_uuid("3080")
+
+# Main states (STATE_UUID value >> 8)
+MAINSTATE_IDLE = 1
+MAINSTATE_WAIT = 2
+MAINSTATE_WAIT_ENERGY = 4
+MAINSTATE_CHARGING = 6
+MAINSTATE_FINISH = 8
+MAINSTATE_RESERVED = 16
+MAINSTATE_ERROR = 15728640
+
+# Main states where the charger is delivering or about to deliver energy.
+ACTIVE_MAINSTATES = frozenset({MAINSTATE_WAIT_ENERGY, MAINSTATE_CHARGING})
@@ -0,0 +1,165 @@
+"""Ring buffer of the electrical samples of a charger."""
+
+import math
+from array import array
+from operator import attrgetter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    from .models import WittyOnePhaseState
+
+DEFAULT_SIZE = 4096
+HOUR = 3600
+
+# Channel name, index in WittyOneDevice.phases_states (3 is the total)
+# and attribute of WittyOnePhaseState.
+CHANNELS: tuple[tuple[str, int, str], ...] = (
+    *((f"voltage_{phase + 1}", phase, "voltage") for phase in range(3)),
+    *((f"current_{phase + 1}", phase, "current") for phase in range(3)),
+    *((f"power_{phase + 1}", phase, "active_power") for phase in range(3)),
+    ("power", 3, "active_power"),
+    ("frequency", 3, "frequency"),
+)
+
+type HourlyStatistics = dict[str, tuple[float, float, float]]
+
+
+class ElectricalHistory:
+    """
+    The last `size` electrical samples, each channel in an array of floats.
+
+    The oldest sample is overwritten when the buffer is full, unless it is
+    not older than `keep_after` (not imported yet): the buffer grows instead.
+    By default no sample is kept.
+    """
+
+    __slots__ = (
+        "_columns",
+        "_next",
+        "count",
+        "keep_after",
+        "size",
+        "timestamps",
+        "values",
+    )
+
+    def __init__(self, size: int = DEFAULT_SIZE) -> None:
+        """Allocate the arrays."""
+        self.size = size
+        self.count = 0
+        self.keep_after = math.inf
+        self._next = 0
+        self.timestamps = array("d", bytes(8 * size))
+        self.values = {name: array("f", bytes(4 * size)) for name, _, _ in CHANNELS}
+        self._columns = self._getters()
+
+    def _getters(
+        self,
+    ) -> tuple[tuple[array[float], int, Callable[[WittyOnePhaseState], float]], ...]:
+        return tuple(
+            (self.values[name], phase, attrgetter(attribute))
+            for name, phase, attribute in CHANNELS
+        )
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return self.count
+
+    def append(
+        self, timestamp: float, phases_states: Sequence[WittyOnePhaseState]
+    ) -> None:
+        """Add the sample of the phases and the total at `timestamp`."""
+        if len(phases_states) < 4:  # noqa: PLR2004 3 phases and the total
+            return
+        if self.count == self.size and self.timestamps[self._next] >= self.keep_after:
+            self._grow()
+        index = self._next
+        self.timestamps[index] = timestamp
+        for column, phase, getter in self._columns:
+            column[index] = getter(phases_states[phase])
+        self._next = (index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def _grow(self) -> None:
+        """Double the size of the arrays, the samples are kept in order."""
+        indexes = self._indexes()
+        self.timestamps = _resized(self.timestamps, indexes, 2 * self.size)
+        self.values = {
+            name: _resized(column, indexes, 2 * self.size)
+            for name, column in self.values.items()
+        }
+        self._columns = self._getters()
+        self._next = self.count
+        self.size *= 2
+
+    def samples(self, start: float) -> dict[str, list[float]]:
+        """Return the timestamps and the channels of the samples from `start`."""
+        indexes = [
+            index for index in self._indexes() if self.timestamps[index] >= start
+        ]
+        return {
+            "timestamps": [self.timestamps[index] for index in indexes],
+            **{
+                name: [column[index] for index in indexes]
+                for name, column in self.values.items()
+            },
+        }
+
+    def restore(self, samples: dict[str, list[float]]) -> None:
+        """Add the samples returned by `samples`, after the ones recorded."""
+        for position, timestamp in enumerate(samples["timestamps"]):
+            if self.count == self.size:
+                self._grow()
+            index = self._next
+            self.timestamps[index] = timestamp
+            for name, column in self.values.items():
+                column[index] = samples[name][position]
+            self._next = (index + 1) % self.size
+            self.count += 1
+
+    def _indexes(self) -> range:
+        """Return the indexes of the samples, the oldest first."""
+        # Negative indexes wrap around the arrays.
+        start = self._next - self.count
+        return range(start, start + self.count)
+
+    def hourly(
+        self, start: float, end: float
+    ) -> Iterator[tuple[float, HourlyStatistics]]:
+        """
+        Return the mean, min and max of each channel, hour by hour.
+
+        Only the samples from `start` (included) to `end` (excluded) are used,
+        each hour is given by the timestamp of its start.
+        """
+        hour: float | None = None
+        samples: list[int] = []
+        for index in self._indexes():
+            timestamp = self.timestamps[index]
+            if not start <= timestamp < end:
+                continue
+            sample_hour = timestamp - timestamp % HOUR
+            if sample_hour != hour:
+                if samples and hour is not None:
+                    yield hour, self._statistics(samples)
+                hour = sample_hour
+                samples = []
+            samples.append(index)
+        if samples and hour is not None:
+            yield hour, self._statistics(samples)
+
+    def _statistics(self, indexes: list[int]) -> HourlyStatistics:
+        statistics: HourlyStatistics = {}
+        for name, column in self.values.items():
+            values = [column[index] for index in indexes]
+            statistics[name] = (sum(values) / len(values), min(values), max(values))
+        return statistics
+
+
+def _resized(column: array[float], indexes: range, size: int) -> array[float]:
+    """Return the values of `column` at `indexes` in an array of `size`."""
+    resized = array(column.typecode, (column[index] for index in indexes))
+    resized.frombytes(bytes(resized.itemsize * (size - len(resized))))
+    return resized
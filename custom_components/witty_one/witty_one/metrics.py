@@ -0,0 +1,97 @@
+"""Timings of the phases of the polls."""
+
+import statistics
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+DEFAULT_SAMPLES = 100
+
+# Upper bounds in milliseconds of the buckets of the histograms.
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class RollingHistogram:
+    """The durations, in seconds, of the last samples of one phase."""
+
+    __slots__ = ("samples",)
+
+    def __init__(self, size: int = DEFAULT_SAMPLES) -> None:
+        """Initialize an empty histogram keeping `size` samples."""
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def add(self, duration: float) -> None:
+        """Add a sample, the oldest one is dropped when full."""
+        self.samples.append(duration)
+
+    @property
+    def last(self) -> float | None:
+        """Return the last sample."""
+        return self.samples[-1] if self.samples else None
+
+    def quantile(self, quantile: float) -> float | None:
+        """Return the quantile (between 0 and 1) of the samples."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+    def as_dict(self) -> dict[str, float | int | dict[str, int]]:
+        """Return the statistics and the buckets of the samples, in ms."""
+        if not self.samples:
+            return {"count": 0}
+        buckets = dict.fromkeys([f"<={bound}" for bound in BUCKETS_MS], 0)
+        buckets["more"] = 0
+        for sample in self.samples:
+            milliseconds = sample * 1000
+            bucket = next(
+                (f"<={bound}" for bound in BUCKETS_MS if milliseconds <= bound),
+                "more",
+            )
+            buckets[bucket] += 1
+        return {
+            "count": len(self.samples),
+            "last": self.samples[-1] * 1000,
+            "min": min(self.samples) * 1000,
+            "mean": statistics.fmean(self.samples) * 1000,
+            "p50": (self.quantile(0.5) or 0) * 1000,
+            "p90": (self.quantile(0.9) or 0) * 1000,
+            "p99": (self.quantile(0.99) or 0) * 1000,
+            "max": max(self.samples) * 1000,
+            "buckets": buckets,
+        }
+
+
+class PollMetrics:
+    """Rolling histograms of the duration of each phase of the polls."""
+
+    def __init__(self, size: int = DEFAULT_SAMPLES) -> None:
+        """Initialize with no phase."""
+        self.size = size
+        self.phases: dict[str, RollingHistogram] = {}
+
+    def record(self, phase: str, duration: float) -> None:
+        """Record the duration in seconds of one phase."""
+        if (histogram := self.phases.get(phase)) is None:
+            histogram = self.phases[phase] = RollingHistogram(self.size)
+        histogram.add(duration)
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Record the duration of the block, even if it fails."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def as_dict(self) -> dict[str, dict[str, float | int | dict[str, int]]]:
+        """Return the statistics of each phase, durations in ms."""
+        return {
+            phase: histogram.as_dict()
+            for phase, histogram in sorted(self.phases.items())
+        }
@@ -0,0 +1,142 @@
+"""Data read from Witty One device."""
+
+import dataclasses
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneStaticProperties:
+    """Static informations."""
+
+    name: str = ""
+    model: str = ""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOnePhaseEnergy:
+    """Different energies for one phase."""
+
+    active_import_energy: float = 0.0
+    active_export_energy: float = 0.0
+    reactive_import_energy: float = 0.0
+    reactive_export_energy: float = 0.0
+    apparent_energy: float = 0.0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOnePhaseState:
+    """Voltage, current, power and power factor for one phase."""
+
+    voltage: float = 0.0
+    current: float = 0.0
+    active_power: float = 0.0
+    apparent_power: float = 0.0
+    reactive_power: float = 0.0
+    power_factor: float = 0.0
+    cos_phi: float = 0.0
+    quadrant: int = 0
+    frequency: float = 0.0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyCurrentSession:
+    """Current session data for Witty One device."""
+
+    start: int = 0
+    unk1: bytes = b""
+    duration: int = 0
+    energy: float = 0.0
+    unk3: int = 0
+    badge: bytes = b""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneGeneralState:
+    """General state data for Witty One device."""
+
+    mainstate: int = 0
+    substate: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneTemperature:
+    """Temperature with the minimum and maximum seen by the device."""
+
+    value: float = 0.0
+    minimum: float = 0.0
+    maximum: float = 0.0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneVersion:
+    """Firmware version of the application and of the bootloader."""
+
+    app: str = ""
+    boot: str = ""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneDurations:
+    """Durations counters (seconds), the meaning of each one is not known."""
+
+    duration_1: int = 0
+    duration_2: int = 0
+    duration_3: int = 0
+    duration_4: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneCommutations:
+    """Relay commutations counters, the meaning of each one is not known."""
+
+    commutation_1: int = 0
+    commutation_2: int = 0
+    commutation_3: int = 0
+    commutation_4: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneConnectionState:
+    """Connection state values, the meaning of each one is not known."""
+
+    state_1: int = 0
+    state_2: int = 0
+    state_3: int = 0
+    state_4: int = 0
+    state_5: int = 0
+    state_6: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WittyOneDevice:
+    """Reponse data for Witty One device."""
+
+    static_information: WittyOneStaticProperties
+    general: WittyOneGeneralState = dataclasses.field(
+        default_factory=WittyOneGeneralState
+    )
+    energies: tuple[WittyOnePhaseEnergy, ...] = ()
+    phases_states: tuple[WittyOnePhaseState, ...] = ()
+    current_session: WittyCurrentSession = dataclasses.field(
+        default_factory=WittyCurrentSession
+    )
+    ambient_temp: WittyOneTemperature = dataclasses.field(
+        default_factory=WittyOneTemperature
+    )
+    relay_temp: WittyOneTemperature = dataclasses.field(
+        default_factory=WittyOneTemperature
+    )
+    unk_temp: WittyOneTemperature = dataclasses.field(
+        default_factory=WittyOneTemperature
+    )
+    durations: WittyOneDurations = dataclasses.field(default_factory=WittyOneDurations)
+    commutations: WittyOneCommutations = dataclasses.field(
+        default_factory=WittyOneCommutations
+    )
+    car_detect: int = 0
+    cable_lock: int = 0
+    config_cable_lock: int = 0
+    connection_state: WittyOneConnectionState = dataclasses.field(
+        default_factory=WittyOneConnectionState
+    )
+    # Fields whose last read failed, they keep their previous value.
+    stale_fields: frozenset[str] = frozenset()
@@ -2,14 +2,24 @@
 
 import asyncio
 import dataclasses
-import struct
-from typing import TYPE_CHECKING, Any
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-from bleak import BleakClient
-from bleak_retry_connector import establish_connection
+from bleak.exc import BleakError
+from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
 
+from .codec import CODECS, Decoded, ParseError
+from .concurrency import ReadConcurrency
 from .const import (
+    ACTIVE_MAINSTATES,
     AMBIENT_TEMP_UUID,
+    CABLE_LOCK_UUID,
+    CAR_DETECT_UUID,
+    COMMUTATION_UUID,
+    CONFIG_CABLE_LOCK_UUID,
+    CONNECTION_STATE_UUID,
+    DURATIONS_UUID,
     ELECTRIC_STATE_UUID,
     ENERGY_UUID,
     MODEL_UUID,
@@ -17,305 +27,717 @@ from .const import (
     RELAY_TEMP_UUID,
     SESSION_STATE_UUID,
     STATE_UUID,
+    UNK_TEMP_UUID,
+)
+from .metrics import PollMetrics
+from .models import WittyOneDevice, WittyOneStaticProperties
+
+DEFAULT_IDLE_TIMEOUT = 120.0
+# Time budget in seconds of a whole update, from the connection to the end
+# of the reads.
+DEFAULT_POLL_TIMEOUT = 60.0
+# Time given to close the connection, even after the deadline.
+DISCONNECT_TIMEOUT = 5.0
+# Number of consecutive polls where a characteristic fails to be read
+# before the GATT cache is cleared.
+CLEAR_CACHE_AFTER = 3
+
+# Number of consecutive updates failing once connected before pairing
+# again, in case a lost bond is reported by an unknown error.
+PAIR_AGAIN_AFTER = 3
+
+# Errors meaning the bond with the charger is lost (lower case).
+AUTHENTICATION_ERRORS = (
+    "insufficient authentication",
+    "insufficient encryption",
+    "insufficient authorization",
+    "authentication failed",
+    "not paired",
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
     from logging import Logger
     from uuid import UUID
 
+    from bleak import BleakClient
+    from bleak.backends.characteristic import BleakGATTCharacteristic
     from bleak.backends.device import BLEDevice
 
-
-@dataclasses.dataclass
-class WittyOneStaticProperties:
-    """Static informations."""
-
-    name: str = ""
-    model: str = ""
-
-
-@dataclasses.dataclass
-class WittyOnePhaseEnergy:
-    """Different energies for one phase."""
-
-    active_import_energy: float = 0.0
-    active_export_energy: float = 0.0
-    reactive_import_energy: float = 0.0
-    reactive_export_energy: float = 0.0
-    apparent_energy: float = 0.0
-
-
-@dataclasses.dataclass
-class WittyOnePhaseState:
-    """Voltage, current, power and power factor for one phase."""
-
-    voltage: float = 0.0
-    current: float = 0.0
-    active_power: float = 0.0
-    apparent_power: float = 0.0
-    reactive_power: float = 0.0
-    power_factor: float = 0.0
-    cos_phi: float = 0.0
-    quadrant: int = 0
-    frequency: float = 0.0
-
-
-@dataclasses.dataclass
-class WittyCurrentSession:
-    """Current session data for Witty One device."""
-
-    start: int = 0
-    unk1: bytes = b""
-    duration: int = 0
-    energy: float = 0.0
-    unk3: int = 0
-    badge: bytes = b""
-
-
-@dataclasses.dataclass
-class WittyOneGeneralState:
-    """General state data for Witty One device."""
-
-    mainstate: int = 0
-    substate: int = 0
-
-
-@dataclasses.dataclass
-class WittyOneDevice:
-    """Reponse data for Witty One device."""
-
-    static_information: WittyOneStaticProperties
-    general: WittyOneGeneralState = dataclasses.field(
-        default_factory=WittyOneGeneralState
-    )
-    energies: list[WittyOnePhaseEnergy] = dataclasses.field(default_factory=list)
-    phases_states: list[WittyOnePhaseState] = dataclasses.field(default_factory=list)
-    current_session: WittyCurrentSession = dataclasses.field(
-        default_factory=WittyCurrentSession
-    )
-
-
-class ParseError(Exception):
-    """Error during parse."""
+    from .capture import GattCapture
 
 
-async def _read_string(client: BleakClient, uuid: str | UUID) -> str:
-    tmp = await client.read_gatt_char(uuid)
-    try:
-        (length,) = struct.unpack("<H", tmp[0:2])
-        return tmp[2 : 2 + length].rstrip(b"\0").decode("utf-8")
-    except struct.error as err:
-        msg = (
-            f"witty_one for {uuid}, receive buffer[{len(tmp)}] {tmp.hex()} for a string"
-        )
-        raise ParseError(msg) from err
-
-
-def _unpack(fmt: str, buffer: bytearray, property_name: str) -> tuple[Any, ...]:
-    try:
-        return struct.unpack(fmt, buffer)
-    except struct.error as err:
-        msg = (
-            f"witty_one for {property_name} {fmt} receive "
-            f"buffer[{len(buffer)}] {buffer.hex()}"
-        )
-        raise ParseError(msg) from err
+def _is_authentication_error(error: BleakError) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in AUTHENTICATION_ERRORS)
 
 
-def _unpack_from(fmt: str, buffer: bytearray, property_name: str) -> tuple[Any, ...]:
-    try:
-        return struct.unpack_from(fmt, buffer)
-    except struct.error as err:
-        msg = (
-            f"witty_one for {property_name} {fmt} receive "
-            f"buffer[{len(buffer)}] {buffer.hex()}"
-        )
-        raise ParseError(msg) from err
-
-
-async def _read_static_properties(client: BleakClient) -> WittyOneStaticProperties:
-    (
-        name,
-        model,
-    ) = await asyncio.gather(
-        _read_string(client, NAME_UUID),
-        _read_string(client, MODEL_UUID),
-    )
-    return WittyOneStaticProperties(
-        name=name,
-        model=model,
+async def _establish_connection(
+    ble_device: BLEDevice, disconnected_callback: Callable[[BleakClient], None]
+) -> BleakClient:
+    return await establish_connection(
+        BleakClientWithServiceCache,
+        ble_device,
+        ble_device.address,
+        disconnected_callback=disconnected_callback,
     )
 
 
-async def _read_energy(client: BleakClient) -> list[WittyOnePhaseEnergy]:
-    tmp = await client.read_gatt_char(ENERGY_UUID)
-    values = _unpack("<HQQQQQQQQQQQQQQQQQQQQ", tmp, "energy")
-    return [
-        WittyOnePhaseEnergy(
-            active_import_energy=values[1] / 1000,
-            active_export_energy=values[2] / 1000,
-            reactive_import_energy=values[3] / 1000,
-            reactive_export_energy=values[4] / 1000,
-            apparent_energy=values[5] / 1000,
-        ),
-        WittyOnePhaseEnergy(
-            active_import_energy=values[6] / 1000,
-            active_export_energy=values[7] / 1000,
-            reactive_import_energy=values[8] / 1000,
-            reactive_export_energy=values[9] / 1000,
-            apparent_energy=values[10] / 1000,
-        ),
-        WittyOnePhaseEnergy(
-            active_import_energy=values[11] / 1000,
-            active_export_energy=values[12] / 1000,
-            reactive_import_energy=values[13] / 1000,
-            reactive_export_energy=values[14] / 1000,
-            apparent_energy=values[15] / 1000,
-        ),
-        WittyOnePhaseEnergy(
-            active_import_energy=values[16] / 1000,
-            active_export_energy=values[17] / 1000,
-            reactive_import_energy=values[18] / 1000,
-            reactive_export_energy=values[19] / 1000,
-            apparent_energy=values[20] / 1000,
-        ),
-    ]
-
-
-async def _read_phases_state(client: BleakClient) -> list[WittyOnePhaseState]:
-    tmp = await client.read_gatt_char(ELECTRIC_STATE_UUID)
-    values = _unpack("<Hlllllllllllllllllllllllllllllll", tmp, "phases_state")
-    return [
-        WittyOnePhaseState(
-            voltage=values[1] / 1000,
-            current=values[2] / 1000,
-            active_power=values[3] / 1000,
-            apparent_power=values[4] / 1000,
-            reactive_power=values[5] / 1000,
-            power_factor=values[6] / 1000,
-            cos_phi=values[7] / 1000,
-            quadrant=values[8],
-        ),
-        WittyOnePhaseState(
-            voltage=values[9] / 1000,
-            current=values[10] / 1000,
-            active_power=values[11] / 1000,
-            apparent_power=values[12] / 1000,
-            reactive_power=values[13] / 1000,
-            power_factor=values[14] / 1000,
-            cos_phi=values[15] / 1000,
-            quadrant=values[16],
-        ),
-        WittyOnePhaseState(
-            voltage=values[17] / 1000,
-            current=values[18] / 1000,
-            active_power=values[19] / 1000,
-            apparent_power=values[20] / 1000,
-            reactive_power=values[21] / 1000,
-            power_factor=values[22] / 1000,
-            cos_phi=values[23] / 1000,
-            quadrant=values[24],
-        ),
-        WittyOnePhaseState(
-            active_power=values[25] / 1000,
-            apparent_power=values[26] / 1000,
-            reactive_power=values[27] / 1000,
-            power_factor=values[28] / 1000,
-            cos_phi=values[29] / 1000,
-            quadrant=values[30],
-            frequency=values[31] / 1000,
-        ),
-    ]
-
-
-async def _current_session(client: BleakClient) -> WittyCurrentSession:
-    tmp = await client.read_gatt_char(SESSION_STATE_UUID)
-    values = _unpack_from("<HL7sLQB7s", tmp, "current_session")
-    return WittyCurrentSession(
-        start=values[1],
-        unk1=values[2],
-        duration=values[3],
-        energy=values[4] / 1000,
-        unk3=values[5],
-        badge=values[6],
-    )
-
-
-async def _read_general_state(client: BleakClient) -> WittyOneGeneralState:
-    tmp = await client.read_gatt_char(STATE_UUID)
-    values = _unpack_from("<HI", tmp, "general_state")
-    return WittyOneGeneralState(mainstate=values[1] >> 8, substate=values[1] & 0xFF)
-
-
-async def _ambient_temp(client: BleakClient) -> float:
-    tmp = await client.read_gatt_char(AMBIENT_TEMP_UUID)
-    (_, value, _min_value, _max_value) = _unpack("<Hhhh", tmp, "ambient_temp")
-    return value / 100
-
-
-async def _relay_temp(client: BleakClient) -> float:
-    tmp = await client.read_gatt_char(RELAY_TEMP_UUID)
-    (_, value, _min_value, _max_value) = _unpack("<Hhhh", tmp, "relay_temp")
-    return value / 100
+# For each dynamic characteristic, the field of WittyOneDevice it updates.
+DYNAMIC_CHARACTERISTICS: dict[UUID, str] = {
+    STATE_UUID: "general",
+    ENERGY_UUID: "energies",
+    ELECTRIC_STATE_UUID: "phases_states",
+    SESSION_STATE_UUID: "current_session",
+    AMBIENT_TEMP_UUID: "ambient_temp",
+    RELAY_TEMP_UUID: "relay_temp",
+    UNK_TEMP_UUID: "unk_temp",
+    DURATIONS_UUID: "durations",
+    COMMUTATION_UUID: "commutations",
+    CAR_DETECT_UUID: "car_detect",
+    CABLE_LOCK_UUID: "cable_lock",
+    CONFIG_CABLE_LOCK_UUID: "config_cable_lock",
+    CONNECTION_STATE_UUID: "connection_state",
+}
+
+
+# Number of updates between two reads of each dynamic characteristic,
+# when the charger is idle and when it is active.
+REFRESH_CYCLES: dict[UUID, tuple[int, int]] = {
+    STATE_UUID: (1, 1),
+    ELECTRIC_STATE_UUID: (1, 1),
+    ENERGY_UUID: (10, 3),
+    SESSION_STATE_UUID: (10, 1),
+    AMBIENT_TEMP_UUID: (10, 3),
+    RELAY_TEMP_UUID: (10, 3),
+    UNK_TEMP_UUID: (10, 3),
+    DURATIONS_UUID: (30, 10),
+    COMMUTATION_UUID: (30, 30),
+    CAR_DETECT_UUID: (1, 1),
+    CABLE_LOCK_UUID: (1, 1),
+    CONFIG_CABLE_LOCK_UUID: (10, 10),
+    CONNECTION_STATE_UUID: (10, 1),
+}
+
+# Configuration characteristics that can be written.
+WRITABLE_CHARACTERISTICS = frozenset({CONFIG_CABLE_LOCK_UUID})
+
+
+class CommandError(Exception):
+    """The value read after a write is not the one written."""
+
+
+class _Command(NamedTuple):
+    uuid: UUID
+    values: tuple[Any, ...]
+    future: asyncio.Future[Any]
 
 
 class WittyOneDeviceData:
     """Data for Witty One device."""
 
-    static_properties: WittyOneStaticProperties | None = None
-
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         logger: Logger,
+        *,
+        persistent: bool = False,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        notify: bool = False,
+        poll_timeout: float = DEFAULT_POLL_TIMEOUT,
+        connector: Callable[
+            [BLEDevice, Callable[[BleakClient], None]], Awaitable[BleakClient]
+        ] = _establish_connection,
     ) -> None:
-        """Initialize the WittyOneDeviceData with a logger."""
+        """
+        Initialize the WittyOneDeviceData with a logger.
+
+        With `persistent` the BLE connection is kept open between updates and
+        only closed after `idle_timeout` seconds without update or notification.
+        With `notify` (only used with `persistent`) the dynamic characteristics
+        that support it are subscribed and each notification is reported
+        to `on_update`, they are no longer read by `update_device`.
+        `on_connect` is called when a connection is opened, before the pairing
+        and the reads, `on_disconnect` when it is closed.
+        Each update must end within `poll_timeout` seconds, see `update_device`.
+        `connector` opens the connection, it can be replaced to use another
+        backend than bleak (see `ReplayCharger`).
+        """
         super().__init__()
         self.logger = logger
-
-    async def update_device(self, ble_device: BLEDevice) -> WittyOneDevice:
-        """Update the device."""
-        client = await establish_connection(BleakClient, ble_device, ble_device.address)
+        self.persistent = persistent
+        self.idle_timeout = idle_timeout
+        self.notify = notify and persistent
+        self.poll_timeout = poll_timeout
+        # Updates stopped by their deadline.
+        self.expired_polls = 0
+        self._deadline: float | None = None
+        self._expired = False
+        self.connector = connector
+        # Fields of WittyOneDevice to read, None for all of them. The
+        # general state is always read.
+        self.fields: frozenset[str] | None = None
+        self.metrics = PollMetrics()
+        # Limits the reads in flight, can be shared by the chargers of a proxy.
+        self.concurrency = ReadConcurrency()
+        # Records the raw buffers read, if set.
+        self.capture: GattCapture | None = None
+        self.on_update: Callable[[WittyOneDevice], None] | None = None
+        self.on_connect: Callable[[], None] | None = None
+        self.on_disconnect: Callable[[], None] | None = None
+        self.static_properties: WittyOneStaticProperties | None = None
+        # The charger stays bonded, it is only paired again on an
+        # authentication error or after `PAIR_AGAIN_AFTER` failed updates.
+        self.paired = False
+        self._connected_failures = 0
+        self.handles: dict[UUID, int] = {}
+        self._verify_model = False
+        self.device: WittyOneDevice | None = None
+        # Fields read by the last update, notification or command.
+        self.updated_fields: frozenset[str] = frozenset()
+        self.notifying: set[UUID] = set()
+        self._client: BleakClient | None = None
+        self._new_connection = False
+        self._cycle = 0
+        self._last_read: dict[UUID, int] = {}
+        self._failures: dict[UUID, int] = {}
+        self.stale: set[UUID] = set()
+        self._decoded: dict[UUID, Decoded] = {}
+        self._idle_timer: asyncio.TimerHandle | None = None
+        self._idle_task: asyncio.Task[None] | None = None
+        self._commands: deque[_Command] = deque()
+        # Held by the updates and the commands, only one uses the connection.
+        self._lock = asyncio.Lock()
+
+    def restore(
+        self, static_properties: WittyOneStaticProperties, handles: dict[UUID, int]
+    ) -> None:
+        """
+        Restore the static properties and characteristic handles of a cache.
+
+        The model is read again with the first update, the cache is dropped
+        if it does not match.
+        """
+        self.static_properties = static_properties
+        self.handles = dict(handles)
+        self._verify_model = True
+
+    def invalidate_cache(self) -> None:
+        """Forget the static properties and the characteristic handles."""
+        self.static_properties = None
+        self.handles.clear()
+        self._verify_model = False
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True if a connection to the device is open."""
+        return self._client is not None and self._client.is_connected
+
+    def _on_disconnected(self, client: BleakClient) -> None:
+        if client is self._client:
+            self.logger.debug("Disconnected from %s", client.address)
+            self._client = None
+            self.notifying.clear()
+            if self.on_disconnect is not None:
+                self.on_disconnect()
+
+    async def _get_client(self, ble_device: BLEDevice) -> BleakClient:
+        self._cancel_idle_disconnect()
+        if self._client is not None and self._client.is_connected:
+            return self._client
+
+        async with asyncio.timeout_at(self._deadline):
+            with self.metrics.measure("connect"):
+                client = await self.connector(ble_device, self._on_disconnected)
+            self._client = client
+            self._new_connection = True
+            self.notifying.clear()
+            if self.on_connect is not None:
+                self.on_connect()
+            if not self.paired:
+                await self._pair(client)
+            if self.notify:
+                with self.metrics.measure("subscribe"):
+                    await self._start_notify(client)
+        return client
+
+    async def _pair(self, client: BleakClient) -> None:
+        async with asyncio.timeout_at(self._deadline):
+            with self.metrics.measure("pair"):
+                await client.pair()
+        self.paired = True
+
+    async def _start_notify(self, client: BleakClient) -> None:
+        for uuid in filter(self._wanted, DYNAMIC_CHARACTERISTICS):
+            characteristic = client.services.get_characteristic(uuid)
+            if characteristic is None or not {"notify", "indicate"}.intersection(
+                characteristic.properties
+            ):
+                continue
+            try:
+                await client.start_notify(
+                    characteristic, partial(self._on_notification, uuid)
+                )
+            except Exception:  # noqa: BLE001 the characteristic is still polled
+                self.logger.debug("Fail to subscribe to %s", uuid, exc_info=True)
+            else:
+                self.notifying.add(uuid)
+        self.logger.debug("Subscribed to %s", self.notifying)
+
+    def _on_notification(
+        self, uuid: UUID, _characteristic: BleakGATTCharacteristic, data: bytearray
+    ) -> None:
+        if self.device is None:
+            # Wait for a first complete read before pushing partial data.
+            return
+        field = DYNAMIC_CHARACTERISTICS[uuid]
         try:
-            await client.pair()
+            value = self._decode(uuid, data)
+        except ParseError:
+            self.logger.warning("Ignore invalid notification", exc_info=True)
+            return
+        self.stale.discard(uuid)
+        stale_fields = self._stale_fields()
+        if (
+            value is getattr(self.device, field)
+            and stale_fields == self.device.stale_fields
+        ):
+            return
+        self.updated_fields = frozenset({field})
+        self.device = dataclasses.replace(
+            self.device, stale_fields=stale_fields, **{field: value}
+        )
+        if self._idle_timer is not None:
+            self._schedule_idle_disconnect()
+        if self.on_update is not None:
+            self.on_update(self.device)
+
+    def _cancel_idle_disconnect(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _schedule_idle_disconnect(self) -> None:
+        self._cancel_idle_disconnect()
+        self._idle_timer = asyncio.get_running_loop().call_later(
+            self.idle_timeout, self._idle_disconnect
+        )
+
+    def _idle_disconnect(self) -> None:
+        self._idle_timer = None
+        self.logger.debug("Connection idle for %ss, disconnecting", self.idle_timeout)
+        self._idle_task = asyncio.get_running_loop().create_task(self.disconnect())
+
+    async def disconnect(self) -> None:
+        """Close the connection to the device if one is open."""
+        self._cancel_idle_disconnect()
+        client, self._client = self._client, None
+        self.notifying.clear()
+        if client is not None:
+            with self.metrics.measure("disconnect"):
+                try:
+                    async with asyncio.timeout(DISCONNECT_TIMEOUT):
+                        await client.disconnect()
+                except TimeoutError:
+                    self.logger.warning("Timeout disconnecting from %s", client.address)
+            if self.on_disconnect is not None:
+                self.on_disconnect()
+
+    def queue_write(self, uuid: UUID, *values: Any) -> asyncio.Future[Any]:
+        """
+        Queue the write of the raw `values` to the characteristic `uuid`.
+
+        The commands are run at the start of the next update, or by
+        `run_commands` on the open connection, so they do not open their own
+        connection. The characteristic is read again after the write, the
+        future gets the value read or a `CommandError` if it differs.
+        """
+        if uuid not in WRITABLE_CHARACTERISTICS:
+            msg = f"{uuid} cannot be written"
+            raise ValueError(msg)
+        future = asyncio.get_running_loop().create_future()
+        self._commands.append(_Command(uuid, values, future))
+        return future
+
+    @property
+    def has_commands(self) -> bool:
+        """Return True if commands wait for a connection."""
+        return any(not command.future.done() for command in self._commands)
+
+    async def run_commands(self) -> None:
+        """
+        Run the queued commands now if a connection is open.
+
+        An update running holds the connection, the commands are run by it
+        and this returns once it ended.
+        """
+        async with self._lock:
+            client = self._client
+            if client is None or not client.is_connected or not self._commands:
+                return
+            self._cancel_idle_disconnect()
+            self._start_deadline()
+            try:
+                await self._run_commands(client)
+            except BleakError, TimeoutError:
+                # The error is given to the command, the others wait for the
+                # next update.
+                await self.disconnect()
+                return
+            if self.persistent:
+                self._schedule_idle_disconnect()
+
+    async def _run_commands(self, client: BleakClient) -> None:
+        while self._commands:
+            uuid, values, future = self._commands.popleft()
+            if future.done():
+                # Cancelled by the caller.
+                continue
+            codec = CODECS[uuid]
+            try:
+                async with asyncio.timeout_at(self._deadline):
+                    with self.metrics.measure(f"write {codec.name}"):
+                        await client.write_gatt_char(
+                            self._characteristic(client, uuid),
+                            codec.encode(*values),  # pyright: ignore[reportAttributeAccessIssue]
+                            response=True,
+                        )
+                    value = await self._read(client, uuid)
+            except (BleakError, TimeoutError) as err:
+                future.set_exception(err)
+                raise
+            except ParseError as err:
+                future.set_exception(err)
+                continue
+            self._confirm(uuid, value)
+            if (value,) != values:
+                msg = f"{codec.name} is {value} after writing {values}"
+                future.set_exception(CommandError(msg))
+            else:
+                future.set_result(value)
+
+    def _confirm(self, uuid: UUID, value: Any) -> None:
+        """Update the device with the value read after a write."""
+        self._last_read[uuid] = self._cycle
+        self.stale.discard(uuid)
+        if self.device is not None and (field := DYNAMIC_CHARACTERISTICS.get(uuid)):
+            self.updated_fields = frozenset({field})
+            self.device = dataclasses.replace(
+                self.device, stale_fields=self._stale_fields(), **{field: value}
+            )
+
+    def _start_deadline(self) -> None:
+        self._deadline = asyncio.get_running_loop().time() + self.poll_timeout
+        self._expired = False
 
-            if self.static_properties is None:
+    async def update_device(self, ble_device: BLEDevice) -> WittyOneDevice:
+        """
+        Update the device, the duration of each phase is in `metrics`.
+
+        The update ends within `poll_timeout` seconds: the connection and the
+        pairing fail with a `TimeoutError` when it is reached, the reads still
+        running are cancelled and the values already read are returned, the
+        others are stale. The connection is closed after an update stopped by
+        its deadline.
+        """
+        async with self._lock:
+            self._start_deadline()
+            with self.metrics.measure("poll"):
+                client: BleakClient | None = None
                 try:
-                    self.static_properties = await _read_static_properties(client)
-                except Exception:
-                    self.logger.exception("Fail to read static info")
-                    self.logger.warning(
-                        'try to add CONFIG_BT_GATTC_MAX_CACHE_CHAR: "80"'
-                        " to sdkconfig_options if you use esphome"
-                    )
-                    if callable(getattr(client, "clear_cache", None)):
-                        await client.clear_cache()  # pyright: ignore[reportAttributeAccessIssue]
+                    client = await self._get_client(ble_device)
+                    try:
+                        await self._run_commands(client)
+                        device = await self._read_device(client)
+                    except BleakError as err:
+                        if not _is_authentication_error(err):
+                            raise
+                        self.logger.info("Bond lost, pairing again: %s", err)
+                        self.paired = False
+                        await self._pair(client)
+                        await self._run_commands(client)
+                        device = await self._read_device(client)
+                except BaseException as err:
+                    if self._expired or self._deadline_reached():
+                        self.expired_polls += 1
+                    if client is not None and isinstance(err, Exception):
+                        self._count_connected_failure()
+                    await self.disconnect()
                     raise
 
-            device = WittyOneDevice(static_information=self.static_properties)
+                self._connected_failures = 0
+                self.device = device
+                if self._expired:
+                    self.expired_polls += 1
+                    self.logger.debug("Deadline of the update reached, disconnecting")
+                    await self.disconnect()
+                elif self.persistent:
+                    self._schedule_idle_disconnect()
+                else:
+                    await self.disconnect()
+            return device
+
+    def _count_connected_failure(self) -> None:
+        """Pair again with the next connection if the updates keep failing."""
+        self._connected_failures += 1
+        if self.paired and self._connected_failures >= PAIR_AGAIN_AFTER:
+            self.logger.info(
+                "%s updates failed once connected, pairing again",
+                self._connected_failures,
+            )
+            self.paired = False
+            self._connected_failures = 0
+
+    def _deadline_reached(self) -> bool:
+        return (
+            self._deadline is not None
+            and asyncio.get_running_loop().time() >= self._deadline
+        )
 
+    async def _read_device(self, client: BleakClient) -> WittyOneDevice:
+        if self.static_properties is None:
             try:
-                (
-                    device.general,
-                    device.energies,
-                    device.phases_states,
-                    device.current_session,
-                ) = await asyncio.gather(
-                    _read_general_state(client),
-                    _read_energy(client),
-                    _read_phases_state(client),
-                    _current_session(client),
-                )
-            except ParseError:
-                self.logger.exception(
-                    "Fail to read dynamic info, cache cleared, try again"
+                self.static_properties = await self._read_static_properties(client)
+            except Exception as err:
+                if isinstance(err, TimeoutError) or (
+                    isinstance(err, BleakError) and _is_authentication_error(err)
+                ):
+                    raise
+                self.logger.exception("Fail to read static info")
+                self.logger.warning(
+                    'try to add CONFIG_BT_GATTC_MAX_CACHE_CHAR: "80"'
+                    " to sdkconfig_options if you use esphome"
                 )
+                self.invalidate_cache()
                 if callable(getattr(client, "clear_cache", None)):
                     await client.clear_cache()  # pyright: ignore[reportAttributeAccessIssue]
                 raise
-        finally:
-            await client.disconnect()
 
-        return device
+        # The cache may be cleared by the reads, they are read again next time.
+        static_properties = self.static_properties
+        device = self.device or WittyOneDevice(static_information=static_properties)
+        to_read = self._characteristics_to_read(self.device)
+        if not self._verify_model:
+            values = await self._read_dynamics(client, to_read)
+        else:
+            # Check the restored cache along with the first update.
+            values = await self._read_dynamics(client, [*to_read, MODEL_UUID])
+            model = values.pop(MODEL_UUID, None)
+            self._verify_model = model is None
+            if model is not None and model != static_properties.model:
+                self.logger.warning(
+                    "Model %s does not match the cached %s, cache cleared",
+                    model,
+                    static_properties.model,
+                )
+                self.invalidate_cache()
+                return await self._read_device(client)
+        if to_read and not values:
+            if self._expired:
+                msg = "Deadline of the update reached before any read"
+                raise TimeoutError(msg)
+            msg = "Fail to read all the dynamic info"
+            raise ParseError(msg)
+
+        # On a state change, the other values are refreshed without waiting
+        # for their next turn.
+        general = values.get(STATE_UUID)
+        if (
+            self.device is not None
+            and general is not None
+            and general.mainstate != self.device.general.mainstate
+        ):
+            values |= await self._read_dynamics(
+                client,
+                [
+                    uuid
+                    for uuid in filter(self._wanted, DYNAMIC_CHARACTERISTICS)
+                    if uuid not in values and uuid not in self.notifying
+                ],
+            )
+
+        self._new_connection = False
+        self._cycle += 1
+        self.updated_fields = frozenset(
+            DYNAMIC_CHARACTERISTICS[uuid] for uuid in values
+        )
+        # Unchanged values are the same objects, keep the same device if
+        # nothing changed.
+        changes = {
+            field: value
+            for uuid, value in values.items()
+            if getattr(device, field := DYNAMIC_CHARACTERISTICS[uuid]) is not value
+        }
+        if (stale_fields := self._stale_fields()) != device.stale_fields:
+            changes["stale_fields"] = stale_fields
+        if not changes and device.static_information is static_properties:
+            return device
+        return dataclasses.replace(
+            device, static_information=static_properties, **changes
+        )
+
+    def _characteristics_to_read(self, device: WittyOneDevice | None) -> list[UUID]:
+        if device is None:
+            return list(filter(self._wanted, DYNAMIC_CHARACTERISTICS))
+
+        active = device.general.mainstate in ACTIVE_MAINSTATES
+        to_read = []
+        for uuid, (idle_period, active_period) in REFRESH_CYCLES.items():
+            if not self._wanted(uuid):
+                continue
+            if uuid in self.notifying:
+                # Values received by notification are already up to date,
+                # unless some were missed while disconnected.
+                if self._new_connection or uuid in self.stale:
+                    to_read.append(uuid)
+                continue
+            period = active_period if active else idle_period
+            last_read = self._last_read.get(uuid)
+            if last_read is None or self._cycle - last_read >= period:
+                to_read.append(uuid)
+        return to_read
+
+    def _wanted(self, uuid: UUID) -> bool:
+        return (
+            uuid == STATE_UUID
+            or self.fields is None
+            or DYNAMIC_CHARACTERISTICS[uuid] in self.fields
+        )
+
+    def _stale_fields(self) -> frozenset[str]:
+        return frozenset(
+            DYNAMIC_CHARACTERISTICS[uuid]
+            for uuid in self.stale
+            if uuid in DYNAMIC_CHARACTERISTICS
+        )
+
+    def _decode(self, uuid: UUID, data: bytearray) -> Any:
+        decoded = CODECS[uuid].refresh(data, self._decoded.get(uuid))
+        self._decoded[uuid] = decoded
+        return decoded.value
+
+    def _characteristic(
+        self, client: BleakClient, uuid: UUID
+    ) -> BleakGATTCharacteristic | int | UUID:
+        """Return the handle of a characteristic, read by uuid if unknown."""
+        if (handle := self.handles.get(uuid)) is not None:
+            return handle
+        characteristic = client.services.get_characteristic(uuid)
+        if characteristic is None:
+            return uuid
+        self.handles[uuid] = characteristic.handle
+        return characteristic
+
+    async def _read(self, client: BleakClient, uuid: UUID) -> Any:
+        name = CODECS[uuid].name
+        async with self.concurrency.slot():
+            with self.metrics.measure(f"read {name}"):
+                data = await client.read_gatt_char(self._characteristic(client, uuid))
+        if self.capture is not None:
+            self.capture.record(uuid, data)
+        with self.metrics.measure(f"decode {name}"):
+            return self._decode(uuid, data)
+
+    async def _read_static_properties(
+        self, client: BleakClient
+    ) -> WittyOneStaticProperties:
+        async with asyncio.timeout_at(self._deadline):
+            (
+                name,
+                model,
+            ) = await asyncio.gather(
+                self._read(client, NAME_UUID),
+                self._read(client, MODEL_UUID),
+            )
+        return WittyOneStaticProperties(
+            name=name,
+            model=model,
+        )
+
+    async def _read_all(
+        self, client: BleakClient, uuids: list[UUID], values: dict[UUID, Any]
+    ) -> list[UUID]:
+        """
+        Read the characteristics in `values`, return the ones not decoded.
+
+        The reads still running at the deadline are cancelled, they are
+        neither in `values` nor returned.
+        """
+        loop = asyncio.get_running_loop()
+        remaining = None if self._deadline is None else self._deadline - loop.time()
+        if remaining is not None and remaining <= 0:
+            self._expired = True
+            return []
+        start = loop.time()
+        tasks = {asyncio.create_task(self._read(client, uuid)): uuid for uuid in uuids}
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=remaining)
+        finally:
+            for task in tasks:
+                task.cancel()
+        if pending:
+            self._expired = True
+            self.logger.debug(
+                "Deadline reached, reads of %s cancelled",
+                [tasks[task] for task in pending],
+            )
+            await asyncio.wait(pending, timeout=DISCONNECT_TIMEOUT)
+        failed = []
+        error: BaseException | None = None
+        for task, uuid in tasks.items():
+            if task in pending:
+                continue
+            if (result := task.exception()) is None:
+                values[uuid] = task.result()
+            elif isinstance(result, ParseError):
+                self.logger.debug("Fail to read %s: %s", uuid, result)
+                failed.append(uuid)
+            else:
+                # The connection is lost, the other reads fail too.
+                error = result
+        if not pending:
+            self.concurrency.record_batch(
+                len(tasks), loop.time() - start, error=bool(failed) or error is not None
+            )
+        if error is not None:
+            raise error
+        return failed
+
+    async def _read_dynamics(
+        self, client: BleakClient, uuids: list[UUID]
+    ) -> dict[UUID, Any]:
+        """
+        Read the characteristics, each one succeeds or fails on its own.
+
+        The characteristics that fail are read again once, then they are
+        stale and keep their previous value.
+        """
+        values: dict[UUID, Any] = {}
+        failed = await self._read_all(client, uuids, values)
+        if failed and not self._expired:
+            failed = await self._read_all(client, failed, values)
+
+        for uuid in values:
+            self._last_read[uuid] = self._cycle
+            self._failures.pop(uuid, None)
+            self.stale.discard(uuid)
+        # Reads cancelled by the deadline are stale but not failed.
+        self.stale.update(uuid for uuid in uuids if uuid not in values)
+        for uuid in failed:
+            self._failures[uuid] = self._failures.get(uuid, 0) + 1
+        if not failed:
+            return values
+
+        self.logger.warning("Fail to read %s, previous values kept", failed)
+        # A buffer can be truncated once, clear the cache only if it repeats.
+        if not values or max(self._failures[uuid] for uuid in failed) >= (
+            CLEAR_CACHE_AFTER
+        ):
+            self.logger.warning("Fail to read dynamic info, cache cleared")
+            self._failures.clear()
+            self.invalidate_cache()
+            if callable(getattr(client, "clear_cache", None)):
+                await client.clear_cache()  # pyright: ignore[reportAttributeAccessIssue]
+        return values
 
 
 def model_id_to_name(model_id: str) -> str:
@@ -0,0 +1 @@
+"""Tests of the witty_one integration."""
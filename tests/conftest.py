@@ -0,0 +1,11 @@
+"""Configuration of the tests."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+
+# The parser package does not depend on Home Assistant, import it directly
+# like the benchmarks do. The integration is imported from the root.
+sys.path.insert(0, str(ROOT / "custom_components" / "witty_one"))
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,100 @@
+"""Tests of the circuit breaker of the connections."""
+
+import pytest
+from witty_one.breaker import BreakerState, CircuitBreaker
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    """Return a breaker without jitter."""
+    return CircuitBreaker(threshold=3, base_delay=10.0, max_delay=25.0, jitter=0.0)
+
+
+def test_backoff_doubles_up_to_max(breaker: CircuitBreaker) -> None:
+    """Each failure doubles the delay, up to the maximum."""
+    assert breaker.backoff() == 0.0
+    delays = []
+    for now in range(3):
+        breaker.record_failure(now)
+        delays.append(breaker.backoff())
+    assert delays == [10.0, 20.0, 25.0]
+
+
+def test_jitter_shortens_delay() -> None:
+    """The jitter removes up to its part of the delay."""
+    breaker = CircuitBreaker(base_delay=10.0, jitter=0.25)
+    breaker.record_failure(0.0)
+    for _ in range(20):
+        assert 7.5 <= breaker.backoff() <= 10.0
+
+
+def test_opens_after_threshold(breaker: CircuitBreaker) -> None:
+    """The breaker opens after `threshold` consecutive failures."""
+    breaker.record_failure(0.0)
+    breaker.record_failure(1.0)
+    assert breaker.state is BreakerState.CLOSED
+
+    breaker.record_failure(2.0)
+
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.opened_at == 2.0
+    assert breaker.retry_at == 27.0
+
+
+def test_success_resets_failures(breaker: CircuitBreaker) -> None:
+    """A success closes the breaker and forgets the failures."""
+    breaker.record_failure(0.0)
+    breaker.record_failure(1.0)
+    breaker.record_success()
+    breaker.record_failure(2.0)
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.failures == 1
+
+
+def test_probe_waits_for_delay_and_advertisement(breaker: CircuitBreaker) -> None:
+    """The breaker half opens once the delay elapsed and the charger advertised."""
+    for now in range(3):
+        breaker.record_failure(now)
+
+    # Delay not elapsed.
+    assert breaker.probe(last_seen=20.0, now=20.0) is BreakerState.OPEN
+    # Not heard since the breaker opened.
+    assert breaker.probe(last_seen=1.0, now=30.0) is BreakerState.OPEN
+    assert breaker.probe(last_seen=None, now=30.0) is BreakerState.OPEN
+
+    assert breaker.probe(last_seen=28.0, now=30.0) is BreakerState.HALF_OPEN
+
+
+def test_half_open_failure_opens_again(breaker: CircuitBreaker) -> None:
+    """A failure of the connection tried half open opens the breaker again."""
+    for now in range(3):
+        breaker.record_failure(now)
+    breaker.probe(last_seen=28.0, now=30.0)
+
+    breaker.record_failure(31.0)
+
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.opened_at == 31.0
+    assert breaker.retry_at == 56.0
+
+
+def test_half_open_success_closes(breaker: CircuitBreaker) -> None:
+    """A success of the connection tried half open closes the breaker."""
+    for now in range(3):
+        breaker.record_failure(now)
+    breaker.probe(last_seen=28.0, now=30.0)
+
+    breaker.record_success()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.as_dict() == {
+        "state": BreakerState.CLOSED,
+        "failures": 0,
+        "opened_at": None,
+        "retry_at": None,
+    }
+
+
+def test_probe_closed_breaker(breaker: CircuitBreaker) -> None:
+    """Probing a closed breaker does not change it."""
+    assert breaker.probe(last_seen=None, now=0.0) is BreakerState.CLOSED
@@ -0,0 +1,115 @@
+"""Tests of the decoding of the characteristics."""
+
+import struct
+
+import pytest
+from witty_one.codec import CODECS, ParseError
+from witty_one.const import (
+    AMBIENT_TEMP_UUID,
+    CONFIG_CABLE_LOCK_UUID,
+    ELECTRIC_STATE_UUID,
+    MODEL_UUID,
+    STATE_UUID,
+)
+from witty_one.models import (
+    WittyOneGeneralState,
+    WittyOnePhaseState,
+    WittyOneTemperature,
+)
+
+
+def _pack(fmt: str, *values: object) -> bytearray:
+    return bytearray(struct.pack("<H" + fmt, struct.calcsize("<" + fmt), *values))
+
+
+def _phases(current_2: int = 16000) -> bytearray:
+    phase = [230000, 16000, 3680000, 3680000, 0, 1000, 1000, 1]
+    phase_2 = [230000, current_2, 3680000, 3680000, 0, 1000, 1000, 1]
+    total = [11040000, 11040000, 0, 1000, 1000, 1, 50000]
+    return _pack("l" * 31, *phase, *phase_2, *phase, *total)
+
+
+def test_decode_general_state() -> None:
+    """The state is split in main state and sub state."""
+    assert CODECS[STATE_UUID].decode(_pack("IH", 6 << 8 | 1, 0)) == (
+        WittyOneGeneralState(mainstate=6, substate=1)
+    )
+
+
+def test_decode_scaled_values() -> None:
+    """The scaled fields are divided, the others are kept as read."""
+    phases = CODECS[ELECTRIC_STATE_UUID].decode(_phases())
+
+    assert len(phases) == 4
+    assert phases[0] == WittyOnePhaseState(
+        voltage=230.0,
+        current=16.0,
+        active_power=3680.0,
+        apparent_power=3680.0,
+        reactive_power=0.0,
+        power_factor=1.0,
+        cos_phi=1.0,
+        quadrant=1,
+    )
+    assert phases[3].active_power == 11040.0
+    assert phases[3].frequency == 50.0
+    assert CODECS[AMBIENT_TEMP_UUID].decode(_pack("hhh", 2512, -180, 4500)) == (
+        WittyOneTemperature(value=25.12, minimum=-1.8, maximum=45.0)
+    )
+
+
+def test_decode_memoryview() -> None:
+    """A memoryview is decoded like the buffer it shows."""
+    buffer = _phases()
+    codec = CODECS[ELECTRIC_STATE_UUID]
+    assert codec.decode(memoryview(buffer)) == codec.decode(buffer)
+
+
+def test_decode_string() -> None:
+    """The padding of a string is removed."""
+    buffer = bytearray(struct.pack("<H", 16) + b"XVR111STI".ljust(16, b"\0"))
+    assert CODECS[MODEL_UUID].decode(buffer) == "XVR111STI"
+
+
+@pytest.mark.parametrize("uuid", [ELECTRIC_STATE_UUID, MODEL_UUID])
+def test_decode_truncated_buffer(uuid: object) -> None:
+    """A buffer too short raises a ParseError."""
+    with pytest.raises(ParseError):
+        CODECS[uuid].decode(bytearray(b"\x02"))  # pyright: ignore[reportArgumentType]
+
+
+def test_refresh_unchanged() -> None:
+    """The previous result is returned when the buffer did not change."""
+    codec = CODECS[ELECTRIC_STATE_UUID]
+    previous = codec.refresh(_phases())
+    assert codec.refresh(_phases(), previous) is previous
+
+
+def test_refresh_shares_unchanged_records() -> None:
+    """Only the records whose values changed are decoded again."""
+    codec = CODECS[ELECTRIC_STATE_UUID]
+    previous = codec.refresh(_phases())
+
+    refreshed = codec.refresh(_phases(current_2=8000), previous)
+
+    assert refreshed is not previous
+    assert refreshed.value[1].current == 8.0
+    assert refreshed.value[1] is not previous.value[1]
+    for index in (0, 2, 3):
+        assert refreshed.value[index] is previous.value[index]
+
+
+def test_refresh_string_unchanged() -> None:
+    """The previous string is returned when the text did not change."""
+    codec = CODECS[MODEL_UUID]
+    buffer = bytearray(struct.pack("<H", 16) + b"XVR111STI".ljust(16, b"\0"))
+    previous = codec.refresh(buffer)
+    assert codec.refresh(bytearray(buffer), previous) is previous
+
+
+def test_encode() -> None:
+    """The buffer written is decoded to the values encoded."""
+    codec = CODECS[CONFIG_CABLE_LOCK_UUID]
+    buffer = codec.encode(1)  # pyright: ignore[reportAttributeAccessIssue]
+    assert buffer == b"\x01\x00\x01"
+    assert codec.decode(buffer) == 1
@@ -0,0 +1,96 @@
+"""Tests of the connection slots of the standalone collector."""
+
+import asyncio
+
+from witty_one.collector import WittyOneCollector
+
+from benchmarks.fake import FakeSettings, FakeWittyOne
+
+
+def _collector(
+    count: int, *, concurrency: int, persistent: bool
+) -> tuple[WittyOneCollector, list[FakeWittyOne]]:
+    settings = FakeSettings(latency=0.001, connect_latency=0.005)
+    fakes = [
+        FakeWittyOne(f"AA:BB:CC:DD:EE:{index:02X}", settings, seed=index)
+        for index in range(count)
+    ]
+    connectors = {fake.address: fake.connect for fake in fakes}
+
+    async def connect(ble_device, disconnected_callback):  # noqa: ANN001, ANN202
+        return await connectors[ble_device.address](ble_device, disconnected_callback)
+
+    collector = WittyOneCollector(
+        connectors,
+        concurrency=concurrency,
+        persistent=persistent,
+        connector=connect,
+    )
+    collector.devices = {fake.address: fake.ble_device for fake in fakes}
+    return collector, fakes
+
+
+def _connected(collector: WittyOneCollector) -> int:
+    return sum(charger.data.is_connected for charger in collector.chargers.values())
+
+
+async def _poll_rounds(collector: WittyOneCollector, rounds: int) -> int:
+    """Poll all the chargers `rounds` times, return the most connected at once."""
+    most = 0
+
+    async def watch() -> None:
+        nonlocal most
+        while True:
+            most = max(most, _connected(collector))
+            await asyncio.sleep(0)
+
+    watcher = asyncio.create_task(watch())
+    for _ in range(rounds):
+        results = await asyncio.gather(
+            *(collector.poll(charger) for charger in collector.chargers.values())
+        )
+        assert all(result is not None for result in results)
+    watcher.cancel()
+    return most
+
+
+def test_persistent_connections_limited_by_concurrency() -> None:
+    """A persistent connection holds its slot, no more are open than allowed."""
+
+    async def run() -> None:
+        collector, _ = _collector(4, concurrency=2, persistent=True)
+        assert await _poll_rounds(collector, 3) <= 2
+        assert _connected(collector) <= 2
+        for charger in collector.chargers.values():
+            await charger.data.disconnect()
+            assert not charger.slot
+
+    asyncio.run(run())
+
+
+def test_persistent_connections_kept_without_waiter() -> None:
+    """With a slot for each charger the connections stay open between polls."""
+
+    async def run() -> None:
+        collector, fakes = _collector(2, concurrency=2, persistent=True)
+        await _poll_rounds(collector, 3)
+        assert [fake.connections for fake in fakes] == [1, 1]
+        assert _connected(collector) == 2
+        for charger in collector.chargers.values():
+            await charger.data.disconnect()
+
+    asyncio.run(run())
+
+
+def test_slot_released_after_failure() -> None:
+    """A charger not found gives its slot back."""
+
+    async def run() -> None:
+        collector, _ = _collector(1, concurrency=1, persistent=True)
+        collector.devices.clear()
+        charger = next(iter(collector.chargers.values()))
+        assert await collector.poll(charger) is None
+        assert not charger.slot
+        assert charger.failures == 1
+
+    asyncio.run(run())
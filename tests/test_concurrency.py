@@ -0,0 +1,87 @@
+"""Tests of the limit of the GATT reads in flight."""
+
+import asyncio
+
+from witty_one.concurrency import MIN_BATCH, STABLE_BATCHES, ReadConcurrency
+
+
+def _stable(concurrency: ReadConcurrency, rate: float) -> None:
+    """Record `STABLE_BATCHES` batches without error at `rate` reads/s."""
+    for _ in range(STABLE_BATCHES):
+        concurrency.record_batch(MIN_BATCH, MIN_BATCH / rate, error=False)
+
+
+def test_tries_higher_limit() -> None:
+    """The next limit is tried when the current one is the best known."""
+    concurrency = ReadConcurrency(max_limit=4, initial=2)
+    _stable(concurrency, 10.0)
+    assert concurrency.limit == 3
+
+
+def test_keeps_best_throughput() -> None:
+    """The limit with the best throughput is kept."""
+    concurrency = ReadConcurrency(max_limit=4, initial=2)
+    _stable(concurrency, 10.0)
+    _stable(concurrency, 5.0)
+    assert concurrency.limit == 2
+    assert concurrency.as_dict()["reads_per_s"] == {2: 10.0, 3: 5.0}
+
+
+def test_small_batches_ignored() -> None:
+    """A batch smaller than `MIN_BATCH` does not count."""
+    concurrency = ReadConcurrency(max_limit=4, initial=2)
+    for _ in range(STABLE_BATCHES):
+        concurrency.record_batch(1, 0.1, error=False)
+    assert concurrency.limit == 2
+    assert concurrency.throughput == {}
+
+
+def test_error_serializes_and_lowers_ceiling() -> None:
+    """After an error the reads are serial and the limit that failed is banned."""
+    concurrency = ReadConcurrency(max_limit=4, initial=3)
+    concurrency.record_batch(3, 0.1, error=False)
+
+    concurrency.record_batch(3, 0.1, error=True)
+
+    assert concurrency.limit == 1
+    assert concurrency.ceiling == 2
+    assert concurrency.errors == 1
+    assert concurrency.failures == {3: 1}
+    assert 3 not in concurrency.throughput
+
+
+def test_failed_limit_tried_again() -> None:
+    """The limit that failed is tried again after batches without error."""
+    concurrency = ReadConcurrency(max_limit=4, initial=3)
+    concurrency.record_batch(3, 0.1, error=True)
+
+    # Serial, then 2 (the ceiling).
+    _stable(concurrency, 10.0)
+    assert concurrency.limit == 2
+    assert concurrency.ceiling == 2
+    # 3 failed once, it is allowed after twice `STABLE_BATCHES` batches.
+    _stable(concurrency, 20.0)
+    assert concurrency.ceiling == 3
+    _stable(concurrency, 20.0)
+    assert concurrency.limit == 3
+
+
+def test_slot_limits_reads_in_flight() -> None:
+    """No more than `limit` blocks run at the same time."""
+    concurrency = ReadConcurrency(max_limit=4, initial=2)
+    active = peak = 0
+
+    async def _read() -> None:
+        nonlocal active, peak
+        async with concurrency.slot():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def _run() -> None:
+        await asyncio.gather(*(_read() for _ in range(6)))
+
+    asyncio.run(_run())
+    assert peak == 2
+    assert active == 0
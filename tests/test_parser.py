@@ -0,0 +1,303 @@
+"""Tests of the updates of `WittyOneDeviceData` against a fake charger."""
+
+import asyncio
+import logging
+
+import pytest
+from witty_one import WittyOneDeviceData
+from witty_one.codec import ParseError
+from witty_one.const import CONFIG_CABLE_LOCK_UUID, ELECTRIC_STATE_UUID
+from witty_one.parser import DEFAULT_POLL_TIMEOUT, PAIR_AGAIN_AFTER, REFRESH_CYCLES
+
+from benchmarks.fake import FakeSettings, FakeWittyOne
+
+# Fields read on every update while charging.
+EVERY_UPDATE = frozenset(
+    {
+        "general",
+        "phases_states",
+        "current_session",
+        "car_detect",
+        "cable_lock",
+        "connection_state",
+    }
+)
+
+
+def _data(
+    charger: FakeWittyOne,
+    *,
+    persistent: bool = False,
+    poll_timeout: float = DEFAULT_POLL_TIMEOUT,
+) -> WittyOneDeviceData:
+    return WittyOneDeviceData(
+        logging.getLogger(__name__),
+        persistent=persistent,
+        poll_timeout=poll_timeout,
+        connector=charger.connect,  # pyright: ignore[reportArgumentType]
+    )
+
+
+def test_refresh_each_characteristic_on_its_period() -> None:
+    """The slow characteristics are only read every few updates."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger)
+        updated = []
+        for _ in range(4):
+            charger.advance()
+            await data.update_device(charger.ble_device)
+            updated.append(data.updated_fields)
+
+        assert "commutations" in updated[0]
+        assert updated[1] == updated[2] == EVERY_UPDATE
+        assert updated[3] == EVERY_UPDATE | {
+            "energies",
+            "ambient_temp",
+            "relay_temp",
+            "unk_temp",
+        }
+
+    asyncio.run(_run())
+
+
+def test_refresh_slower_while_idle() -> None:
+    """An idle charger reads its session state every 10 updates."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne(settings=FakeSettings(charging=False))
+        data = _data(charger)
+        updated = []
+        for _ in range(11):
+            charger.advance()
+            await data.update_device(charger.ble_device)
+            updated.append(data.updated_fields)
+
+        assert [
+            index for index, fields in enumerate(updated) if "current_session" in fields
+        ] == [0, 10]
+
+    asyncio.run(_run())
+
+
+def test_keep_values_read_when_one_fails() -> None:
+    """A truncated characteristic keeps its previous value and is stale."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger)
+        charger.advance()
+        first = await data.update_device(charger.ble_device)
+        assert first.stale_fields == frozenset()
+
+        charger.written[ELECTRIC_STATE_UUID] = bytearray(2)
+        charger.advance()
+        device = await data.update_device(charger.ble_device)
+
+        assert device.phases_states is first.phases_states
+        assert device.stale_fields == {"phases_states"}
+        assert data.updated_fields == EVERY_UPDATE - {"phases_states"}
+        assert device.general is not None
+
+        del charger.written[ELECTRIC_STATE_UUID]
+        charger.advance()
+        device = await data.update_device(charger.ble_device)
+
+        assert device.phases_states is not first.phases_states
+        assert device.stale_fields == frozenset()
+
+    asyncio.run(_run())
+
+
+def test_fail_when_nothing_is_read() -> None:
+    """An update without any value decoded fails."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger)
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        charger.written.update(dict.fromkeys(REFRESH_CYCLES, bytearray(2)))
+        charger.advance()
+        with pytest.raises(ParseError):
+            await data.update_device(charger.ble_device)
+
+    asyncio.run(_run())
+
+
+def test_pair_only_once() -> None:
+    """A bonded charger is not paired again on the next connections."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger)
+        for _ in range(3):
+            charger.advance()
+            await data.update_device(charger.ble_device)
+
+        assert charger.connections == 3
+        assert charger.pairings == 1
+
+    asyncio.run(_run())
+
+
+def test_pair_again_when_bond_lost() -> None:
+    """An authentication error pairs again within the same update."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger)
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        charger.bonded = False
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        assert charger.pairings == 2
+        assert charger.connections == 2
+
+    asyncio.run(_run())
+
+
+def test_pair_again_after_failures_once_connected() -> None:
+    """Updates failing once connected pair again with the next connection."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger)
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        charger.written.update(dict.fromkeys(REFRESH_CYCLES, bytearray(2)))
+        for _ in range(PAIR_AGAIN_AFTER):
+            assert data.paired
+            charger.advance()
+            with pytest.raises(ParseError):
+                await data.update_device(charger.ble_device)
+        assert not data.paired
+
+        charger.written.clear()
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        assert data.paired
+        assert charger.pairings == 2
+
+    asyncio.run(_run())
+
+
+def test_command_on_open_connection() -> None:
+    """A command is written at once on a persistent connection."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger, persistent=True)
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        future = data.queue_write(CONFIG_CABLE_LOCK_UUID, 0)
+        await data.run_commands()
+
+        assert await future == 0
+        assert not data.has_commands
+        assert data.device is not None
+        assert data.device.config_cable_lock == 0
+        assert data.updated_fields == {"config_cable_lock"}
+        assert charger.connections == 1
+        await data.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_command_queued_during_update_waits_for_next() -> None:
+    """A command queued after an update ran its commands is kept for the next."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne(settings=FakeSettings(latency=0.05))
+        data = _data(charger)
+        charger.advance()
+        update = asyncio.create_task(data.update_device(charger.ble_device))
+        # The update is in its first reads, past its commands.
+        await asyncio.sleep(0.01)
+        assert charger.in_flight
+
+        future = data.queue_write(CONFIG_CABLE_LOCK_UUID, 0)
+        # Waits for the update, which closes the connection.
+        await data.run_commands()
+
+        assert update.done()
+        assert not data.is_connected
+        assert data.has_commands
+        assert charger.writes == 0
+
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        assert await future == 0
+        assert not data.has_commands
+        assert charger.writes == 1
+
+    asyncio.run(_run())
+
+
+def test_command_cancelled_is_not_written() -> None:
+    """A command cancelled by the caller is dropped by the next update."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne()
+        data = _data(charger)
+        data.queue_write(CONFIG_CABLE_LOCK_UUID, 0).cancel()
+        assert not data.has_commands
+
+        charger.advance()
+        await data.update_device(charger.ble_device)
+
+        assert charger.writes == 0
+
+    asyncio.run(_run())
+
+
+def test_deadline_cancels_reads_still_running() -> None:
+    """The reads running at the deadline are cancelled, the others are kept."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne(settings=FakeSettings(latency=0.05))
+        data = _data(charger, persistent=True, poll_timeout=0.2)
+        charger.advance()
+        device = await data.update_device(charger.ble_device)
+
+        assert data.expired_polls == 1
+        assert not data.is_connected
+        assert charger.in_flight == 0
+        assert device.stale_fields
+        assert "general" in data.updated_fields
+        assert data.updated_fields.isdisjoint(device.stale_fields)
+
+        # The next update reads the stale values.
+        data.poll_timeout = DEFAULT_POLL_TIMEOUT
+        charger.advance()
+        device = await data.update_device(charger.ble_device)
+
+        assert device.stale_fields == frozenset()
+        assert data.expired_polls == 1
+        await data.disconnect()
+
+    asyncio.run(_run())
+
+
+def test_deadline_reached_while_connecting() -> None:
+    """A connection slower than the deadline fails the update."""
+
+    async def _run() -> None:
+        charger = FakeWittyOne(settings=FakeSettings(connect_latency=0.1))
+        data = _data(charger, poll_timeout=0.02)
+        with pytest.raises(TimeoutError):
+            await data.update_device(charger.ble_device)
+
+        assert data.expired_polls == 1
+        assert data.device is None
+
+    asyncio.run(_run())
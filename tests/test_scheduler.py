@@ -0,0 +1,145 @@
+"""Tests of the connection slots shared by the chargers."""
+
+import asyncio
+
+from custom_components.witty_one.scheduler import WittyOneConnectionScheduler
+
+
+def _scheduler() -> WittyOneConnectionScheduler:
+    return WittyOneConnectionScheduler(max_connections=2, stagger=0.0)
+
+
+def test_acquire_until_full() -> None:
+    """Each source gives `max_connections` slots, the others wait."""
+
+    async def _run() -> None:
+        scheduler = _scheduler()
+        await scheduler.acquire("proxy", "A")
+        await scheduler.acquire("proxy", "B")
+        assert scheduler.free_slots("proxy") == 0
+        assert scheduler.free_slots("other") == 2
+
+        waiter = asyncio.create_task(scheduler.acquire("proxy", "C"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert scheduler.source_of("C") is None
+
+        scheduler.release("A")
+        await waiter
+        assert scheduler.source_of("A") is None
+        assert scheduler.source_of("C") == "proxy"
+        assert scheduler.free_slots("proxy") == 0
+
+    asyncio.run(_run())
+
+
+def test_release_in_order() -> None:
+    """The waiting chargers get the slots in their order of arrival."""
+
+    async def _run() -> None:
+        scheduler = _scheduler()
+        await scheduler.acquire("proxy", "A")
+        await scheduler.acquire("proxy", "B")
+        waiters = [
+            asyncio.create_task(scheduler.acquire("proxy", address))
+            for address in ("C", "D")
+        ]
+        await asyncio.sleep(0)
+
+        scheduler.release("B")
+        await asyncio.sleep(0)
+        assert waiters[0].done()
+        assert not waiters[1].done()
+
+        scheduler.release("C")
+        await waiters[1]
+        assert scheduler.source_of("D") == "proxy"
+
+    asyncio.run(_run())
+
+
+def test_release_twice() -> None:
+    """Releasing a charger without a slot does nothing."""
+
+    async def _run() -> None:
+        scheduler = _scheduler()
+        await scheduler.acquire("proxy", "A")
+        scheduler.release("A")
+        scheduler.release("A")
+        scheduler.release("unknown")
+        assert scheduler.free_slots("proxy") == 2
+
+    asyncio.run(_run())
+
+
+def test_acquire_held_slot() -> None:
+    """A charger holding a slot keeps it, or moves it to another source."""
+
+    async def _run() -> None:
+        scheduler = _scheduler()
+        await scheduler.acquire("proxy", "A")
+        await scheduler.acquire("proxy", "A")
+        assert scheduler.free_slots("proxy") == 1
+
+        await scheduler.acquire("other", "A")
+        assert scheduler.free_slots("proxy") == 2
+        assert scheduler.free_slots("other") == 1
+        assert scheduler.source_of("A") == "other"
+
+    asyncio.run(_run())
+
+
+def test_cancelled_waiter_frees_its_place() -> None:
+    """A charger cancelled while waiting leaves the queue without a slot."""
+
+    async def _run() -> None:
+        scheduler = _scheduler()
+        await scheduler.acquire("proxy", "A")
+        await scheduler.acquire("proxy", "B")
+        waiter = asyncio.create_task(scheduler.acquire("proxy", "C"))
+        await asyncio.sleep(0)
+        assert scheduler.free_slots("proxy") == 0
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release("A")
+
+        assert scheduler.source_of("C") is None
+        assert scheduler.free_slots("proxy") == 1
+
+    asyncio.run(_run())
+
+
+def test_sources_share_read_concurrency() -> None:
+    """The chargers of a source share its limit of reads in flight."""
+    scheduler = _scheduler()
+    assert scheduler.read_concurrency("proxy") is scheduler.read_concurrency("proxy")
+    assert scheduler.read_concurrency("proxy") is not scheduler.read_concurrency(
+        "other"
+    )
+
+
+def test_move_to_source_used() -> None:
+    """A connection opened through another source takes its slot there."""
+
+    async def _run() -> None:
+        scheduler = _scheduler()
+        await scheduler.acquire("proxy", "A")
+        await scheduler.acquire("proxy", "B")
+        await scheduler.acquire("other", "C")
+        await scheduler.acquire("other", "D")
+        waiter = asyncio.create_task(scheduler.acquire("proxy", "E"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        # The slot given back goes to the charger waiting for it, the
+        # connection is counted on the full source.
+        scheduler.move("A", "other")
+        await waiter
+
+        assert scheduler.source_of("A") == "other"
+        assert scheduler.source_of("E") == "proxy"
+        scheduler.release("C")
+        assert scheduler.free_slots("other") == 0
+
+    asyncio.run(_run())